@@ -1,39 +1,64 @@
 import tkinter as tk
 from tkinter import messagebox
-import subprocess
-import threading
 import customtkinter
+from cli import load_command
+from scripts.job_runner import JobRunner
 
-# Function to show a "Running..." pop-up
-def show_running_popup():
-    running_popup = tk.Toplevel(root)
-    running_popup.title("Running...")
-    running_popup.geometry("200x100")
-    running_popup.resizable(False, False)
-    tk.Label(running_popup, text="Processing...", font=("Arial", 12)).pack(expand=True)
-    root.update()  # Update UI
-    return running_popup
+MAX_LOG_LINES = 5000 # Older lines are dropped from the log pane
 
+# Persistent worker pool: script functions run in this process, several at a time
+job_runner = JobRunner()
+running_jobs = set()
 
-# Function to run CLI commands in a separate thread
-def run_cli_command(command):
-    running_popup = show_running_popup()
 
-    def execute():
-        try:
-            result = subprocess.run(command, capture_output=True, text=True)
-            messagebox.showinfo("Output", result.stdout)
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            running_popup.destroy()  # Close popup when done
+# Function to queue a script function on the worker pool
+def run_job(name, func, *args, **kwargs):
+    append_log(f"[{job_runner.submit(name, func, *args, **kwargs)}] queued")
+
+
+# Function to run a registered CLI command in-process (its module is imported on first use only)
+def run_cli_command(command, *args, **kwargs):
+    run_job(command, lambda: load_command(command)(*args, **kwargs))
+
+
+# Append a line to the log pane (main thread only)
+def append_log(line):
+    log_text.configure(state="normal")
+    log_text.insert("end", line + "\n")
+
+    # Keep the log pane bounded
+    line_count = int(log_text.index("end-1c").split(".")[0])
+    if line_count > MAX_LOG_LINES:
+        log_text.delete("1.0", f"{line_count - MAX_LOG_LINES}.0")
+
+    log_text.see("end")
+    log_text.configure(state="disabled")
+
+
+# Drain the job events on the Tkinter thread, the only thread allowed to touch widgets
+def pump_job_events():
+    for kind, job, payload in job_runner.drain():
+        if kind == "output":
+            append_log(f"[{job or 'background'}] {payload}")
+        elif kind == "started":
+            running_jobs.add(job)
+            append_log(f"[{job}] started")
+        elif kind == "finished":
+            running_jobs.discard(job)
+            append_log(f"[{job}] finished")
+        elif kind == "failed":
+            running_jobs.discard(job)
+            append_log(f"[{job}] failed: {payload}")
+            messagebox.showerror("Error", f"{job} failed:\n{payload}")
+
+    status_var.set(f"Running jobs: {len(running_jobs)}" if running_jobs else "Idle")
+    root.after(100, pump_job_events)
 
-    threading.Thread(target=execute).start()  # Run in a separate thread
 
 # Initialize Tkinter window
 root = customtkinter.CTk()
 root.title("AWS CLI Management Tool")
-root.geometry("750x800")
+root.geometry("750x950")
 root.configure(bg="#1e1e2e")
 
 # Section Styles
@@ -45,49 +70,56 @@ text_fg = "#f8f8f2"
 def create_instance():
     instance_type = instance_type_var.get()
     os_type = os_var.get()
-    count = instance_count_var.get()
+    count = instance_count_entry.get().strip()
 
-    if count not in ["1", "2"]:  # Ensure valid count
-        messagebox.showerror("Error", "Instance count must be 1 or 2.")
+    if not count.isdigit() or int(count) < 1:  # Ensure valid count
+        messagebox.showerror("Error", "Instance count must be a positive number.")
         return
 
-    run_cli_command(["python", "cli.py", "create-instances", instance_type, os_type, "--count", count])
+    run_cli_command("create-instances", instance_type, os_type, int(count))
+
+
+# Start/Stop EC2 Instances (several IDs can be separated by spaces or commas)
+def get_instance_ids():
+    return instance_entry.get().replace(",", " ").split()
 
 
-# Start/Stop EC2 Instance
 def start_instance():
-    instance_id = instance_entry.get()
-    run_cli_command(["python", "cli.py", "manage-instances", "start", instance_id])
+    run_cli_command("manage-instances start", get_instance_ids())
 
 
 def stop_instance():
-    instance_id = instance_entry.get()
-    run_cli_command(["python", "cli.py", "manage-instances", "stop", instance_id])
+    run_cli_command("manage-instances stop", get_instance_ids())
 
 
 def list_instances():
-    run_cli_command(["python", "cli.py", "list-instances"])
+    run_cli_command("list-instances")
 
 
 # S3 Bucket Functions
 def create_bucket():
     access_type = bucket_access_var.get()
-    run_cli_command(["python", "cli.py", "create-bucket", access_type])
+
+    # Ask on the UI thread, the job itself never prompts
+    if access_type == "public" and not messagebox.askyesno("Confirm", "The new bucket will be public. Are you sure?"):
+        return
+
+    run_cli_command("create-bucket", access_type, skip_confirmation=True)
 
 
 def list_buckets():
-    run_cli_command(["python", "cli.py", "list-buckets"])
+    run_cli_command("list-buckets")
 
 
 def upload_file_to_bucket():
     bucket_name = bucket_name_entry.get()
     file_path = file_path_entry.get()
-    run_cli_command(["python", "cli.py", "upload-file-to-bucket", bucket_name, file_path])
+    run_cli_command("upload-file-to-bucket", bucket_name, [file_path])
 
 
 # Route 53 Functions
 def create_hosted_zone():
-    run_cli_command(["python", "cli.py", "create-hosted-zone"])
+    run_cli_command("create-hosted-zone")
 
 
 def manage_dns_record():
@@ -97,17 +129,22 @@ def manage_dns_record():
     record_value = dns_record_value_entry.get()
     action = dns_record_action_var.get()
 
-    run_cli_command(["python", "cli.py", "manage-record", zone_name, record_name, record_type, record_value, action])
+    run_cli_command("manage-record", zone_name, record_name, record_type, record_value, action)
 
 
 # Destroy All Resources
 def destroy_resources():
-    run_cli_command(["python", "cli.py", "destroy-resources"])
+    def destroy():
+        failures = load_command("destroy-resources")()
+        if failures:
+            raise RuntimeError(f"{len(failures)} teardown steps failed or were skipped.")
+
+    run_job("destroy-resources", destroy)
 
 
 # Create a scrollable frame inside the root window
 main_frame = customtkinter.CTkScrollableFrame(root)
-main_frame.pack(padx=20, pady=40, fill="both", expand=True)
+main_frame.pack(padx=20, pady=(40, 10), fill="both", expand=True)
 
 # EC2 Management Frame
 ec2_frame = customtkinter.CTkFrame(main_frame)
@@ -129,9 +166,10 @@ tk.Label(create_instance_frame, text="Instance OS:", fg=text_fg, bg=frame_bg).pa
 os_var = tk.StringVar(value="-")
 tk.OptionMenu(create_instance_frame, os_var, "ubuntu", "amazon-linux").pack()
 
-tk.Label(create_instance_frame, text="Amount (1 or 2):", fg=text_fg, bg=frame_bg).pack()
-instance_count_var = tk.StringVar(value="-")
-tk.OptionMenu(create_instance_frame, instance_count_var, "1", "2").pack()
+tk.Label(create_instance_frame, text="Amount:", fg=text_fg, bg=frame_bg).pack()
+instance_count_entry = tk.Entry(create_instance_frame)
+instance_count_entry.insert(0, "1")
+instance_count_entry.pack()
 
 tk.Button(create_instance_frame, text="Create Instance", command=create_instance, bg=button_bg, fg=text_fg).pack(pady=5)
 
@@ -141,7 +179,7 @@ manage_instance_frame.pack(pady=10, fill="x")
 
 tk.Label(manage_instance_frame, text="Manage EC2 Instance", font=("Arial", 12, "bold"), fg=text_fg, bg=frame_bg).pack()
 
-tk.Label(manage_instance_frame, text="Instance ID:", fg=text_fg, bg=frame_bg).pack()
+tk.Label(manage_instance_frame, text="Instance IDs:", fg=text_fg, bg=frame_bg).pack()
 instance_entry = tk.Entry(manage_instance_frame)
 instance_entry.pack()
 
@@ -246,5 +284,20 @@ destroy_frame.pack(pady=10, fill="x")
 
 tk.Button(destroy_frame, text="Destroy All Resources", command=destroy_resources, bg="red", fg="white").pack()
 
+# Job log pane: output of every job streams here line by line
+log_frame = customtkinter.CTkFrame(root)
+log_frame.pack(padx=20, pady=(0, 20), fill="x")
+
+status_var = tk.StringVar(value="Idle")
+tk.Label(log_frame, textvariable=status_var, fg=text_fg, bg=frame_bg).pack(anchor="w")
+
+log_text = tk.Text(log_frame, height=12, state="disabled", bg="#1e1e2e", fg=text_fg, wrap="none")
+log_text.pack(fill="x")
+
+# Route job output to the log pane and start draining it
+job_runner.capture_output()
+root.after(100, pump_job_events)
+
 # Run the UI
 root.mainloop()
+job_runner.shutdown()
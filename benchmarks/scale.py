@@ -0,0 +1,294 @@
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Root of the repository, so `cli` and `scripts` can be imported from a fresh interpreter
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_HISTORY = os.path.join(REPO_ROOT, "benchmarks", "scale-history.json")
+DEFAULT_SIZES = {"buckets": 10000, "instances": 50000, "records": 20000}
+ZONE_NAME = "elad-sopher-zone-1.com"
+CLI_TAGS = {"Managed": "CLI Managed", "Owner": "eladsopher"}
+
+# Code of every scenario, run in a fresh interpreter. Scenarios run in this order, and
+# destroy-resources comes last because it deletes the seeded resources.
+SCENARIOS = {
+    "list-buckets": """
+from scripts.s3_list import list_buckets
+errors = list_buckets(output_format="ndjson")
+if errors:
+    raise RuntimeError(errors)
+""",
+    "get-next-bucket-name": """
+from scripts.helpers import get_next_bucket_name, get_next_bucket_names
+get_next_bucket_name() # Seeds the allocator from the bucket list
+get_next_bucket_names(1000)
+""",
+    "list-instances": """
+from scripts.ec2_list import list_instances
+errors = list_instances(output_format="ndjson")
+if errors:
+    raise RuntimeError(errors)
+""",
+    "manage-dns-record": f"""
+import contextlib, io
+from scripts.route53_manage import manage_dns_record
+
+# manage_dns_record only prints its errors, so check what it printed
+output = io.StringIO()
+with contextlib.redirect_stdout(output):
+    manage_dns_record({ZONE_NAME!r}, "bench.{ZONE_NAME}", "A", "10.0.0.1", "CREATE")
+if "successfully" not in output.getvalue():
+    raise RuntimeError(output.getvalue().strip())
+""",
+    "destroy-resources": """
+from scripts.destroy_resources import delete_retained_instances, destroy_all_cli_buckets, destroy_route53_resources
+from scripts.task_graph import run_task_graph
+
+# The AWS side of destroy_resources; the Pulumi stacks don't exist against the stand-in
+results = run_task_graph({
+    "ec2-instances": (delete_retained_instances, []),
+    "s3-buckets": (destroy_all_cli_buckets, []),
+    "route53-zones": (destroy_route53_resources, []),
+})
+failed = [result for result in results if result["status"] != "succeeded"]
+if failed:
+    raise RuntimeError(f"Teardown steps failed: {failed}")
+""",
+}
+
+# Wraps a scenario: counts API calls through the call tracer and tracks the peak Python memory
+MEASURE_SNIPPET = """
+import contextlib, json, os, time, tracemalloc
+from scripts.aws_clients import get_session
+from scripts.call_tracer import CallTracer
+
+tracer = CallTracer()
+tracer.register(get_session())
+
+tracemalloc.start()
+start = time.perf_counter()
+with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+    exec(compile({code!r}, {name!r}, "exec"))
+wall_seconds = time.perf_counter() - start
+_, peak = tracemalloc.get_traced_memory()
+
+operations = {{f"{{service}}.{{operation}}": stats.calls for (service, operation), stats in tracer.summary_rows()}}
+print(json.dumps({{
+    "wall_seconds": round(wall_seconds, 3),
+    "api_calls": sum(operations.values()),
+    "peak_memory_mb": round(peak / 1024 / 1024, 2),
+    "operations": operations,
+}}))
+"""
+
+def find_free_port():
+    """Returns a free local TCP port for the stand-in server."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_stand_in(port):
+    """
+    Starts a moto server that stands in for EC2, S3 and Route 53.
+
+    Returns:
+    - moto.server.ThreadedMotoServer: The running server (call `stop()` when done).
+    """
+    from moto.server import ThreadedMotoServer
+
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port)
+    server.start()
+    return server
+
+def seed(endpoint_url, sizes, workers=32):
+    """
+    Fills the stand-in account with CLI-managed and unrelated resources.
+
+    Half of the buckets are CLI-managed, so tag scans have to look at every bucket.
+
+    Args:
+    - endpoint_url (str): URL of the stand-in server.
+    - sizes (dict): Number of buckets, instances and DNS records to create.
+    - workers (int): Concurrent requests used for seeding.
+    """
+    import boto3
+
+    session = boto3.session.Session(region_name="us-east-1")
+    s3 = session.client("s3", endpoint_url=endpoint_url)
+    ec2 = session.client("ec2", endpoint_url=endpoint_url)
+    route53 = session.client("route53", endpoint_url=endpoint_url)
+    tag_set = [{"Key": key, "Value": value} for key, value in CLI_TAGS.items()]
+
+    def create_bucket(index):
+        managed = index % 2 == 0
+        name = f"elad-sopher-bucket-{index + 1}" if managed else f"bench-unmanaged-{index + 1}"
+        s3.create_bucket(Bucket=name)
+        if managed:
+            s3.put_bucket_tagging(Bucket=name, Tagging={"TagSet": tag_set})
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(create_bucket, range(sizes["buckets"])))
+
+    image_id = ec2.describe_images(Owners=["amazon"], MaxResults=5)["Images"][0]["ImageId"]
+    for first in range(0, sizes["instances"], 1000):
+        count = min(1000, sizes["instances"] - first)
+        ec2.run_instances(ImageId=image_id, InstanceType="t3.nano", MinCount=count, MaxCount=count,
+                          TagSpecifications=[{"ResourceType": "instance", "Tags": tag_set}])
+
+    zone_id = route53.create_hosted_zone(Name=ZONE_NAME, CallerReference=str(time.time()))["HostedZone"]["Id"].split("/")[-1]
+    route53.change_tags_for_resource(ResourceType="hostedzone", ResourceId=zone_id, AddTags=tag_set)
+    for first in range(0, sizes["records"], 1000):
+        changes = [
+            {"Action": "CREATE", "ResourceRecordSet": {
+                "Name": f"record-{index}.{ZONE_NAME}", "Type": "A", "TTL": 300,
+                "ResourceRecords": [{"Value": "10.0.0.1"}],
+            }}
+            for index in range(first, min(first + 1000, sizes["records"]))
+        ]
+        route53.change_resource_record_sets(HostedZoneId=zone_id, ChangeBatch={"Changes": changes})
+
+def run_scenario(name, environment):
+    """
+    Runs one scenario in a fresh interpreter, so caches and memory from other scenarios don't skew it.
+
+    Args:
+    - name (str): Scenario name (key of SCENARIOS).
+    - environment (dict): Environment variables pointing the CLI at the stand-in.
+
+    Returns:
+    - dict: Wall time, API call counts and peak memory, or the error if the scenario failed.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE_SNIPPET.format(code=SCENARIOS[name], name=name)],
+        cwd=REPO_ROOT, env=environment, capture_output=True, text=True
+    )
+
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1] if result.stderr else "scenario failed"}
+
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def find_regressions(results, history, sizes, tolerance):
+    """
+    Compares the results against the latest recorded run with the same sizes.
+
+    Args:
+    - results (dict): Current results keyed by scenario.
+    - history (list): Previous runs.
+    - sizes (dict): Sizes of the current run.
+    - tolerance (float): Allowed relative increase of wall time and API calls (0.2 means 20%).
+
+    Returns:
+    - list: Human readable description of every regression.
+    """
+    previous_runs = [run for run in history if run.get("sizes") == sizes]
+    if not previous_runs:
+        return []
+
+    baseline = previous_runs[-1]["results"]
+    regressions = []
+
+    for name, current in results.items():
+        previous = baseline.get(name, {})
+        for metric in ("wall_seconds", "api_calls"):
+            if metric not in current or metric not in previous:
+                continue # Nothing to compare against
+            if current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(f"{name} {metric}: {previous[metric]} -> {current[metric]}")
+
+    return regressions
+
+def get_commit():
+    """Returns the current git commit, if the benchmark runs inside a checkout."""
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+def main():
+    """
+    Seeds a local AWS stand-in, measures every scenario and appends the results to a JSON history.
+
+    Needs `pip install "moto[server]"` and a botocore version that honours AWS_ENDPOINT_URL.
+    """
+    parser = argparse.ArgumentParser(description="Measure CLI commands against a large, locally simulated account")
+    parser.add_argument("--buckets", type=int, default=DEFAULT_SIZES["buckets"], help="Buckets to seed")
+    parser.add_argument("--instances", type=int, default=DEFAULT_SIZES["instances"], help="EC2 instances to seed")
+    parser.add_argument("--records", type=int, default=DEFAULT_SIZES["records"], help="DNS records to seed")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS),
+                        help="Scenarios to run (default: all)")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON history file the results are appended to")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed relative increase against the last run with the same sizes (default 0.2)")
+    args = parser.parse_args()
+
+    sizes = {"buckets": args.buckets, "instances": args.instances, "records": args.records}
+    endpoint_url = f"http://127.0.0.1:{find_free_port()}"
+    state_dir = tempfile.mkdtemp(prefix="cli-scale-")
+
+    # Point every scenario at the stand-in and keep its local state away from the user's
+    environment = dict(
+        os.environ,
+        AWS_ENDPOINT_URL=endpoint_url,
+        AWS_ACCESS_KEY_ID="testing",
+        AWS_SECRET_ACCESS_KEY="testing",
+        AWS_DEFAULT_REGION="us-east-1",
+        AWS_REGION="us-east-1",
+        CLI_CACHE_PATH=os.path.join(state_dir, "inventory.db"),
+        CLI_NAME_STATE_PATH=os.path.join(state_dir, "names.json"),
+        CLI_HASH_CACHE_PATH=os.path.join(state_dir, "hash-cache.json"),
+    )
+    os.environ.update({key: environment[key] for key in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY")})
+
+    server = start_stand_in(int(endpoint_url.rsplit(":", 1)[1]))
+    try:
+        print(f"Seeding {sizes['buckets']} buckets, {sizes['instances']} instances and {sizes['records']} DNS records...")
+        start = time.perf_counter()
+        seed(endpoint_url, sizes)
+        print(f"Seeded in {time.perf_counter() - start:.1f}s.\n")
+
+        results = {}
+        for name in [name for name in SCENARIOS if name in args.scenarios]:
+            results[name] = result = run_scenario(name, environment)
+            if "error" in result:
+                print(f"{name:<22} error: {result['error']}")
+            else:
+                print(f"{name:<22} {result['wall_seconds']:>9.2f} s {result['api_calls']:>8} calls "
+                      f"{result['peak_memory_mb']:>9.1f} MB peak")
+    finally:
+        server.stop()
+
+    try:
+        with open(args.history) as f:
+            history = json.load(f)
+    except (OSError, ValueError):
+        history = []
+
+    regressions = find_regressions(results, history, sizes, args.tolerance)
+
+    history.append({
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "commit": get_commit(),
+        "python": sys.version.split()[0],
+        "sizes": sizes,
+        "results": results,
+    })
+    with open(args.history, "w") as f:
+        json.dump(history, f, indent=2)
+
+    if regressions:
+        print("\nScale regressions detected:")
+        for regression in regressions:
+            print(f" - {regression}")
+        sys.exit(1)
+
+    print("\nNo scale regressions detected.")
+
+
+if __name__ == "__main__":
+    main()
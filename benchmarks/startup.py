@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Root of the repository, so `cli` and `scripts` can be imported from a fresh interpreter
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Snippet run in a fresh interpreter: time importing the CLI and resolving a single subcommand
+MEASURE_SNIPPET = """
+import time
+start = time.perf_counter()
+import cli
+cli.load_command({name!r})
+print(time.perf_counter() - start)
+"""
+
+def measure_command(name, runs):
+    """
+    Measures the cold-start import time of a single subcommand.
+
+    Each run spawns a new interpreter so module caches from previous runs don't skew the result.
+
+    Args:
+    - name (str): Registry key of the subcommand.
+    - runs (int): Number of fresh interpreters to sample.
+
+    Returns:
+    - dict: Median, min and max import time in milliseconds, or the error if the import failed.
+    """
+    samples = []
+
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", MEASURE_SNIPPET.format(name=name)],
+            cwd=REPO_ROOT, capture_output=True, text=True
+        )
+
+        if result.returncode != 0:
+            # Missing optional dependencies (e.g. Pulumi) shouldn't abort the whole benchmark
+            return {"error": result.stderr.strip().splitlines()[-1] if result.stderr else "import failed"}
+
+        samples.append(float(result.stdout.strip()) * 1000)
+
+    return {
+        "median_ms": round(statistics.median(samples), 2),
+        "min_ms": round(min(samples), 2),
+        "max_ms": round(max(samples), 2),
+    }
+
+def find_regressions(results, baseline, tolerance):
+    """
+    Compares the current results against a baseline run.
+
+    Args:
+    - results (dict): Current results keyed by subcommand.
+    - baseline (dict): Results of a previous run keyed by subcommand.
+    - tolerance (float): Allowed relative slowdown (0.2 means 20%).
+
+    Returns:
+    - list: Human readable description of every regressed subcommand.
+    """
+    regressions = []
+
+    for name, current in results.items():
+        previous = baseline.get(name, {})
+        if "median_ms" not in current or "median_ms" not in previous:
+            continue # Nothing to compare against
+
+        limit = previous["median_ms"] * (1 + tolerance)
+        if current["median_ms"] > limit:
+            regressions.append(f"{name}: {previous['median_ms']}ms -> {current['median_ms']}ms")
+
+    return regressions
+
+def main():
+    """
+    Records the import time of every CLI subcommand and optionally checks it against a baseline.
+    """
+    sys.path.insert(0, REPO_ROOT)
+    from cli import COMMAND_REGISTRY
+
+    parser = argparse.ArgumentParser(description="Measure CLI cold-start time per subcommand")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to sample per subcommand")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON file of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed relative slowdown against the baseline (default 0.2)")
+    args = parser.parse_args()
+
+    results = {}
+    for name in COMMAND_REGISTRY:
+        results[name] = measure_command(name, args.runs)
+        timing = results[name]
+        if "error" in timing:
+            print(f"{name:<25} error: {timing['error']}")
+        else:
+            print(f"{name:<25} {timing['median_ms']:>9.2f} ms (min {timing['min_ms']}, max {timing['max_ms']})")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        regressions = find_regressions(results, baseline, args.tolerance)
+        if regressions:
+            print("\nStartup regressions detected:")
+            for regression in regressions:
+                print(f" - {regression}")
+            sys.exit(1)
+
+        print("\nNo startup regressions detected.")
+
+
+if __name__ == "__main__":
+    main()
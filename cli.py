@@ -1,15 +1,122 @@
 import argparse
-from scripts.ec2_create import create_instance
-from scripts.ec2_list import list_instances
-from scripts.ec2_manage import start_instance, stop_instance
-from scripts.s3_create import create_bucket
-from scripts.s3_upload import upload_files_to_bucket
-from scripts.s3_list import list_buckets
-from scripts.route53_create import create_hosted_zone
-from scripts.route53_manage import manage_dns_record
-from scripts.destroy_resources import destroy_resources
+import importlib
+import sys
 
-def main():
+# Registry of subcommands mapped to the module and function that implement them.
+# Modules are only imported when their command is invoked, so light commands like
+# `list-instances` don't pay for importing Pulumi and the Automation API.
+COMMAND_REGISTRY = {
+    "create-instances": ("scripts.ec2_create", "create_instance"),
+    "manage-instances start": ("scripts.ec2_manage", "start_instances"),
+    "manage-instances stop": ("scripts.ec2_manage", "stop_instances"),
+    "list-instances": ("scripts.ec2_list", "list_instances"),
+    "create-bucket": ("scripts.s3_create", "create_bucket"),
+    "upload-file-to-bucket": ("scripts.s3_upload", "upload_files_to_bucket"),
+    "list-buckets": ("scripts.s3_list", "list_buckets"),
+    "create-hosted-zone": ("scripts.route53_create", "create_hosted_zone"),
+    "manage-record": ("scripts.route53_manage", "manage_dns_record"),
+    "manage-records-bulk": ("scripts.route53_manage", "manage_dns_records_bulk"),
+    "destroy-resources": ("scripts.destroy_resources", "destroy_resources"),
+    "status": ("scripts.status", "show_status"),
+    "serve": ("scripts.daemon", "serve"),
+}
+
+def load_command(name):
+    """
+    Imports the module behind a registered subcommand and returns its handler.
+
+    Args:
+    - name (str): Registry key of the subcommand (e.g. "list-instances" or "manage-instances start").
+
+    Returns:
+    - callable: The function implementing the subcommand.
+    """
+    module_name, function_name = COMMAND_REGISTRY[name]
+    module = importlib.import_module(module_name) # Import happens only for the invoked command
+    return getattr(module, function_name)
+
+def parse_tag_selector(values):
+    """
+    Parses repeated KEY=VALUE arguments into a tag selector.
+
+    Args:
+    - values (list): "KEY=VALUE" strings.
+
+    Returns:
+    - dict: Tag values per key.
+    """
+    tags = {}
+    for value in values:
+        key, separator, tag_value = value.partition("=")
+        if not separator:
+            raise SystemExit(f"Error: Invalid tag selector '{value}', expected KEY=VALUE.")
+        tags[key] = tag_value
+    return tags
+
+def positive_int(value):
+    """
+    Argument type for counts that must be at least 1.
+
+    Args:
+    - value (str): The raw argument.
+
+    Returns:
+    - int: The parsed count.
+    """
+    count = int(value)
+    if count < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {count}")
+    return count
+
+def non_negative_int(value):
+    """
+    Argument type for limits where 0 means no limit.
+
+    Args:
+    - value (str): The raw argument.
+
+    Returns:
+    - int: The parsed limit.
+    """
+    limit = int(value)
+    if limit < 0:
+        raise argparse.ArgumentTypeError(f"must be at least 0, got {limit}")
+    return limit
+
+def add_pulumi_arguments(parser):
+    """
+    Adds the Pulumi deployment options shared by every create command.
+
+    Args:
+    - parser (argparse.ArgumentParser): Subcommand parser to extend.
+    """
+    parser.add_argument("--parallel", type=int, default=None,
+                        help="Maximum number of resource operations Pulumi runs at once")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Refresh the Pulumi stack state from AWS before deploying")
+
+def add_regions_argument(parser):
+    """
+    Adds the `--regions` option shared by the list and destroy commands.
+
+    Args:
+    - parser (argparse.ArgumentParser): Subcommand parser to extend.
+    """
+    parser.add_argument("--regions", nargs="+", default=None, metavar="REGION",
+                        help="Regions to scan, space or comma separated, or 'all' for every enabled region "
+                             "(default: the configured AWS region)")
+
+def add_output_argument(parser):
+    """
+    Adds the `--output` option shared by the list commands.
+
+    Args:
+    - parser (argparse.ArgumentParser): Subcommand parser to extend.
+    """
+    parser.add_argument("--output", choices=["table", "json", "ndjson", "csv"], default="table",
+                        help="Output format; rows are written as they are fetched (default: table)")
+
+def build_parser():
     """
     AWS Resource Management CLI
 
@@ -21,40 +128,64 @@ def main():
     - EC2: Create, list, and manage (start/stop) EC2 instances.
     - S3: Create S3 buckets, upload files to buckets, and list buckets.
     - Route 53: Create hosted zones and manage DNS records.
+    - Status: Show every CLI-managed resource in one report.
     - Destroy: Destroy all CLI-managed AWS resources (EC2, S3, and Route 53).
 
     Args:
     - None
 
     Returns:
-    - None
+    - argparse.ArgumentParser: The configured CLI parser.
     """
 
     parser = argparse.ArgumentParser(description="AWS Resource Management CLI")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore the local inventory cache and look everything up in AWS")
+    parser.add_argument("--trace-calls", action="store_true",
+                        help="Record every AWS API call and print a per-operation summary at exit (on stderr)")
+    parser.add_argument("--trace-prometheus", default=None, metavar="PATH",
+                        help="With --trace-calls, also write the metrics as a Prometheus textfile")
+    parser.add_argument("--trace-json", default=None, metavar="PATH",
+                        help="With --trace-calls, also write a JSON trace of every call")
 
     # Create subparsers for different commands
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     # EC2 Related Commands
     # Subcommand for creating EC2 instances
-    create_instance_parser = subparsers.add_parser("create-instances", help="Create an EC2 instance")
-    create_instance_parser.add_argument("type", choices=["t3.nano", "t4g.nano"], help="EC2 instance type")
+    create_instance_parser = subparsers.add_parser("create-instances", help="Create one or more EC2 instances")
+    create_instance_parser.add_argument("type", help="EC2 instance type (e.g. t3.nano, t4g.nano, m7g.large)")
     create_instance_parser.add_argument("os", choices=["amazon-linux", "ubuntu"], help="OS for the AMI")
-    create_instance_parser.add_argument("--count", type=int, default=1,
-                                        help="Number of instances to create (max 2)")
+    create_instance_parser.add_argument("--count", type=positive_int, default=1,
+                                        help="Number of instances to create in a single deployment")
+    create_instance_parser.add_argument("--max-running", type=non_negative_int, default=None,
+                                        help="Maximum running CLI-Managed instances (default: CLI_MAX_RUNNING_INSTANCES or 2, 0 disables the limit)")
+    create_instance_parser.add_argument("--ami-source", choices=["search", "ssm"], default="search",
+                                        help="Resolve the AMI by searching official images or via public SSM parameters (faster)")
+    create_instance_parser.add_argument("--ami-cache-ttl", type=float, default=None,
+                                        help="Seconds a cached AMI ID stays valid (default: 1 day)")
+    create_instance_parser.add_argument("--refresh-ami", action="store_true",
+                                        help="Ignore the cached AMI ID and resolve it again")
+    create_instance_parser.add_argument("--region", default=None,
+                                        help="Region to create the instances in (default: the configured AWS region)")
+    add_pulumi_arguments(create_instance_parser)
 
     # Subcommand for managing instances (start/stop)
     manage_instance_parser = subparsers.add_parser("manage-instances",
-                                                   help="Manage a CLI-Managed EC2 instance (start/stop)")
+                                                   help="Manage CLI-Managed EC2 instances (start/stop)")
     manage_instance_subparsers = manage_instance_parser.add_subparsers(dest="action", required=True)
-    start_instance_parser = manage_instance_subparsers.add_parser("start",
-                                                                  help="Start a ClI managed EC2 instance")
-    start_instance_parser.add_argument("instance_id", help="ID of the instance to start")
-    stop_instance_parser = manage_instance_subparsers.add_parser("stop", help="Stop a CLI managed EC2 instance")
-    stop_instance_parser.add_argument("instance_id", help="ID of the instance to stop")
+    for action in ["start", "stop"]:
+        action_parser = manage_instance_subparsers.add_parser(action, help=f"{action.capitalize()} CLI managed EC2 instances")
+        action_parser.add_argument("instance_ids", nargs="*", help=f"IDs of the instances to {action}")
+        action_parser.add_argument("--tag", action="append", default=[], metavar="KEY=VALUE",
+                                   help=f"{action.capitalize()} every CLI managed instance with this tag (repeatable)")
+        action_parser.add_argument("--wait", action="store_true",
+                                   help="Wait until every instance reached the target state")
 
     # Subcommand for listing instances
-    subparsers.add_parser("list-instances", help="List EC2 instances created via the CLI")
+    list_instances_parser = subparsers.add_parser("list-instances", help="List EC2 instances created via the CLI")
+    add_regions_argument(list_instances_parser)
+    add_output_argument(list_instances_parser)
 
 
 
@@ -62,20 +193,41 @@ def main():
     # Subcommand for creating S3 Bucket
     create_bucket_parser = subparsers.add_parser("create-bucket", help="Create a S3 Bucket")
     create_bucket_parser.add_argument("access", choices=["private", "public"], help="Bucket access type")
+    add_pulumi_arguments(create_bucket_parser)
 
     # Subcommand for uploading file to S3 Bucket
-    upload_file_parser = subparsers.add_parser("upload-file-to-bucket", help="Upload a file to a S3 Bucket")
+    upload_file_parser = subparsers.add_parser("upload-file-to-bucket",
+                                               help="Upload files, directories or glob matches to a S3 Bucket")
     upload_file_parser.add_argument("bucket_name", help="Name of the S3 Bucket")
-    upload_file_parser.add_argument("file_path", help="Path to the file to upload")
+    upload_file_parser.add_argument("file_paths", nargs="+",
+                                    help="Files, directories or glob patterns to upload")
+    upload_file_parser.add_argument("--prefix", default="", help="Key prefix for the uploaded objects")
+    upload_file_parser.add_argument("--workers", type=int, default=8, help="Number of files uploaded at the same time")
+    upload_file_parser.add_argument("--part-size-mb", type=int, default=16, help="Multipart upload part size in MB")
+    upload_file_parser.add_argument("--part-concurrency", type=int, default=4,
+                                    help="Parts of a single file uploaded at the same time")
+    upload_file_parser.add_argument("--multipart-threshold-mb", type=int, default=64,
+                                    help="Files larger than this (in MB) are uploaded in parts")
+    upload_file_parser.add_argument("--sync", action="store_true",
+                                    help="Only upload new or changed files (compared by content hash)")
+    upload_file_parser.add_argument("--delete", action="store_true",
+                                    help="With --sync, delete objects under the prefix that no longer exist locally")
+    upload_file_parser.add_argument("--hash-workers", type=int, default=None,
+                                    help="Processes (threads in the daemon) used to hash files with --sync (default: one per CPU)")
 
     # Subcommand for listing S3 Buckets
-    subparsers.add_parser("list-buckets", help="List all CLI-Managed S3 Buckets")
+    list_buckets_parser = subparsers.add_parser("list-buckets", help="List all CLI-Managed S3 Buckets")
+    list_buckets_parser.add_argument("--workers", type=int, default=16,
+                                     help="Number of buckets whose tags are fetched concurrently")
+    add_regions_argument(list_buckets_parser)
+    add_output_argument(list_buckets_parser)
 
 
 
     # Route 53 Related Commands
     # Subcommand for creating a Route 53 hosted zone
-    subparsers.add_parser("create-hosted-zone", help="Create a Route 53 hosted zone")
+    create_zone_parser = subparsers.add_parser("create-hosted-zone", help="Create a Route 53 hosted zone")
+    add_pulumi_arguments(create_zone_parser)
 
     # Subcommand for managing DNS records in a hosted zone
     manage_record_parser = subparsers.add_parser("manage-record",
@@ -88,37 +240,125 @@ def main():
     manage_record_parser.add_argument("action", choices=["CREATE", "UPDATE", "DELETE"],
                                       help="Action to perform")
 
+    # Subcommand for applying many DNS records from a file
+    bulk_record_parser = subparsers.add_parser("manage-records-bulk",
+                                               help="Apply DNS records from a CSV, JSON or YAML file")
+    bulk_record_parser.add_argument("zone_name", help="Hosted zone name (must be CLI-managed)")
+    bulk_record_parser.add_argument("file_path", help="Path to the record file (.csv, .json, .yaml or .yml)")
+    bulk_record_parser.add_argument("--wait", action="store_true", help="Wait until every change is INSYNC")
+
+
+
+    # Subcommand for showing every CLI-managed resource at once
+    status_parser = subparsers.add_parser("status",
+                                          help="Show all CLI-managed EC2 instances, S3 buckets and hosted zones")
+    status_parser.add_argument("--concurrency", type=int, default=32,
+                               help="Maximum number of AWS calls in flight at once across all services")
 
+    # Subcommand for running the long-lived daemon that other CLI invocations hand their commands to
+    serve_parser = subparsers.add_parser("serve",
+                                         help="Keep clients, caches and imports warm and run commands sent by the CLI")
+    serve_parser.add_argument("--socket", default=None,
+                              help="Unix socket to listen on (default: CLI_SOCKET_PATH or ~/.aws-resource-management/cli.sock)")
 
     # Subcommand for destroying all resources
-    subparsers.add_parser("destroy-resources", help="Destroy all CLI-managed AWS resources (EC2, S3 & Route53)")
+    destroy_parser = subparsers.add_parser("destroy-resources",
+                                           help="Destroy all CLI-managed AWS resources (EC2, S3 & Route53)")
+    destroy_parser.add_argument("--workers", type=int, default=16,
+                                help="Number of buckets whose tags are fetched concurrently")
+    destroy_parser.add_argument("--max-parallel", type=int, default=3,
+                                help="Number of teardown steps (EC2, S3, Route 53) run at the same time")
+    destroy_parser.add_argument("--delete-workers", type=int, default=8,
+                                help="Number of concurrent delete requests used to empty each bucket")
+    destroy_parser.add_argument("--zone-workers", type=int, default=4,
+                                help="Number of hosted zones emptied at the same time")
+    add_regions_argument(destroy_parser)
+
+    return parser
+
+
+def main():
+    """
+    Entry point of the CLI: parses the arguments and runs the selected subcommand.
+    """
 
     # Parse CLI arguments
+    parser = build_parser()
     args = parser.parse_args()
 
+    if args.command == "upload-file-to-bucket" and args.delete and not args.sync:
+        parser.error("--delete only works together with --sync")
+
+    # Hand the command to a running daemon if there is one, otherwise run it here
+    from scripts import daemon
+    if daemon.should_use_daemon(args):
+        code = daemon.run_in_daemon(args)
+        if code is not None:
+            sys.exit(code)
+
+    if args.no_cache:
+        from scripts import inventory_cache
+        inventory_cache.set_enabled(False) # Force fresh lookups for this run
+
+    if args.trace_calls or args.trace_prometheus or args.trace_json:
+        from scripts.call_tracer import enable_tracing
+        enable_tracing(args.command, args.trace_prometheus, args.trace_json) # Before any AWS client is created
+
+    run_command(args)
+
+
+def run_command(args):
+    """
+    Resolves the handler for the parsed subcommand and calls it.
+
+    Args:
+    - args (argparse.Namespace): Parsed CLI arguments.
+
+    Returns:
+    - None
+    """
+
     # Call the appropriate function based on the command
     if args.command == "create-instances":
-        create_instance(args.type, args.os, args.count) # Create EC2 instance(s)
+        load_command("create-instances")(args.type, args.os, args.count, args.ami_source, args.ami_cache_ttl,
+                                         args.refresh_ami, args.parallel, args.refresh,
+                                         args.max_running, args.region) # Create EC2 instance(s)
     elif args.command == "manage-instances":
+        tags = parse_tag_selector(args.tag)
         if args.action == "start":
-            start_instance(args.instance_id) # Start the specified EC2 instance
+            load_command("manage-instances start")(args.instance_ids, tags, args.wait) # Start the selected EC2 instances
         elif args.action == "stop":
-            stop_instance(args.instance_id) # Stop the specified EC2 instance
+            load_command("manage-instances stop")(args.instance_ids, tags, args.wait) # Stop the selected EC2 instances
     elif args.command == "list-instances":
-        list_instances() # List EC2 instances
+        if load_command("list-instances")(args.regions, args.output): # List EC2 instances
+            sys.exit(1) # Some regions couldn't be listed
     elif args.command == "create-bucket":
-        create_bucket(args.access) # Create an S3 bucket with specified access type
+        load_command("create-bucket")(args.access, args.parallel, args.refresh) # Create an S3 bucket with specified access type
     elif args.command == "upload-file-to-bucket":
-        upload_files_to_bucket(args.bucket_name, args.file_path) # Upload file to S3 bucket
+        load_command("upload-file-to-bucket")(args.bucket_name, args.file_paths, args.prefix, args.workers,
+                                              args.part_size_mb, args.part_concurrency,
+                                              args.multipart_threshold_mb, args.sync, args.delete,
+                                              args.hash_workers) # Upload files to S3 bucket
     elif args.command == "list-buckets":
-        list_buckets() # List CLI-managed S3 buckets
+        if load_command("list-buckets")(args.workers, args.regions, args.output): # List CLI-managed S3 buckets
+            sys.exit(1)
     elif args.command == "create-hosted-zone":
-        create_hosted_zone() # Create a Route 53 hosted zone
+        load_command("create-hosted-zone")(args.parallel, args.refresh) # Create a Route 53 hosted zone
     elif args.command == "manage-record":
-        manage_dns_record(args.zone_name, args.record_name, args.record_type, args.record_value, args.action) # Manage DNS record
+        load_command("manage-record")(args.zone_name, args.record_name, args.record_type, args.record_value, args.action) # Manage DNS record
+    elif args.command == "manage-records-bulk":
+        if load_command("manage-records-bulk")(args.zone_name, args.file_path, args.wait): # Apply DNS records from a file
+            sys.exit(1) # Some batches were rejected
+    elif args.command == "status":
+        if load_command("status")(args.concurrency): # Show every CLI-managed resource
+            sys.exit(1)
+    elif args.command == "serve":
+        load_command("serve")(args.socket) # Run the daemon until interrupted
     elif args.command == "destroy-resources":
-        destroy_resources() # Destroy all CLI-managed resources
-
+        failures = load_command("destroy-resources")(args.workers, args.max_parallel, args.delete_workers,
+                                                      args.zone_workers, args.regions) # Destroy all CLI-managed resources
+        if failures:
+            sys.exit(1) # Let Jenkins mark the build as failed
 
 if __name__ == "__main__":
     main()
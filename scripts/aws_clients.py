@@ -0,0 +1,65 @@
+import os
+import threading
+import boto3
+from botocore.config import Config
+from scripts.rate_limit import get_rate_limiter
+
+# Connection pool size per client. Raise it when many threads share one client (e.g. tag scans).
+MAX_POOL_CONNECTIONS = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "50"))
+
+# Maximum attempts per API call, including the first one
+MAX_ATTEMPTS = int(os.getenv("AWS_MAX_ATTEMPTS", "10"))
+
+_lock = threading.Lock()
+_session = None
+_clients = {}
+
+def get_session():
+    """
+    Returns the process-wide boto3 session, creating it on first use.
+
+    Credentials and the endpoint resolver are loaded once per process instead of once per client.
+
+    Returns:
+    - boto3.session.Session: The shared session.
+    """
+    global _session
+
+    with _lock:
+        if _session is None:
+            _session = boto3.session.Session()
+        return _session
+
+def get_client(service, region=None):
+    """
+    Returns a shared, thread-safe boto3 client for the given service and region.
+
+    Clients are cached per (service, region), so every script reuses the same
+    connection pool. They use standard retries and TCP keep-alive, and every request
+    waits for the shared rate limiter of its service (see `scripts.rate_limit`), which
+    slows down when AWS throttles.
+
+    Args:
+    - service (str): AWS service name (e.g. "ec2", "s3", "route53").
+    - region (str): AWS region name. None uses the session's default region.
+
+    Returns:
+    - botocore.client.BaseClient: The cached client.
+    """
+    session = get_session()
+    region = region or session.region_name
+    key = (service, region)
+
+    # Creating clients from a shared session isn't thread-safe, so build each one under the lock
+    with _lock:
+        if key not in _clients:
+            config = Config(
+                max_pool_connections=MAX_POOL_CONNECTIONS,
+                # The shared rate limiter replaces adaptive mode's per-client one
+                retries={"mode": "standard", "max_attempts": MAX_ATTEMPTS},
+                tcp_keepalive=True,
+            )
+            client = session.client(service, region_name=region, config=config)
+            get_rate_limiter(service, region).register(client.meta.events)
+            _clients[key] = client
+        return _clients[key]
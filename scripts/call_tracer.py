@@ -0,0 +1,286 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from scripts.rate_limit import THROTTLE_ERROR_CODES
+
+# Upper bounds (in seconds) of the latency histogram buckets
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+MAX_TRACED_CALLS = 100000 # Individual calls kept for the JSON trace, the summary counts every call
+
+class OperationStats:
+    """Counters of one AWS operation (e.g. s3 ListBuckets)."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.throttles = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1) # Last bucket is +Inf
+
+    def observe(self, seconds):
+        self.calls += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        index = next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound), len(LATENCY_BUCKETS))
+        self.histogram[index] += 1
+
+    def percentile(self, fraction):
+        """Upper bound of the histogram bucket holding the given fraction of the calls."""
+        target = fraction * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS + [self.max_seconds], self.histogram):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max_seconds)
+        return self.max_seconds
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "throttles": self.throttles,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "total_seconds": round(self.total_seconds, 6),
+            "max_seconds": round(self.max_seconds, 6),
+            "histogram": dict(zip([str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"], self.histogram)),
+        }
+
+class CallTracer:
+    """
+    Records every AWS API call made through a boto3 session by hooking into botocore's event system.
+
+    Handlers are registered on the session, so every client created from it afterwards is traced.
+    All handlers return None, so they never change how botocore handles a request.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = {} # (service, operation) -> OperationStats
+        self.calls = []
+        self.dropped_calls = 0
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+
+    def register(self, session):
+        """
+        Hooks the tracer into a boto3 session. Clients created before this call aren't traced.
+
+        Args:
+        - session (boto3.session.Session): Session whose clients should be traced.
+        """
+        events = session.events
+        events.register("before-call", self.before_call)
+        events.register("after-call", self.after_call)
+        events.register("after-call-error", self.after_call_error)
+        events.register("before-send", self.before_send)
+        events.register("needs-retry", self.needs_retry)
+
+    @staticmethod
+    def operation_key(event_name):
+        # Event names look like "after-call.s3.ListBuckets"
+        _, service, operation = (event_name.split(".", 2) + ["", ""])[:3]
+        return service, operation
+
+    def get_stats(self, key):
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = OperationStats()
+        return stats
+
+    def before_call(self, context=None, **kwargs):
+        if context is not None:
+            context["trace_started"] = time.perf_counter()
+
+    def record(self, event_name, context, status, retries=0, bytes_received=0):
+        started = (context or {}).get("trace_started")
+        if started is None:
+            return
+        seconds = time.perf_counter() - started
+        service, operation = self.operation_key(event_name)
+
+        with self.lock:
+            stats = self.get_stats((service, operation))
+            stats.observe(seconds)
+            stats.retries += retries
+            stats.bytes_received += bytes_received
+            if status == "error":
+                stats.errors += 1
+
+            if len(self.calls) < MAX_TRACED_CALLS:
+                self.calls.append({
+                    "service": service,
+                    "operation": operation,
+                    "start": round(started - self.started, 6),
+                    "seconds": round(seconds, 6),
+                    "status": status,
+                    "retries": retries,
+                    "thread": threading.current_thread().name,
+                })
+            else:
+                self.dropped_calls += 1
+
+    def after_call(self, event_name=None, http_response=None, parsed=None, context=None, **kwargs):
+        metadata = (parsed or {}).get("ResponseMetadata", {})
+        # Use the header instead of the body, reading a streaming body here would consume it
+        headers = getattr(http_response, "headers", None) or {}
+        length = headers.get("content-length") or headers.get("Content-Length") or 0
+        status = "error" if getattr(http_response, "status_code", 200) >= 300 else "ok"
+        self.record(event_name, context, status, metadata.get("RetryAttempts", 0), int(length))
+
+    def after_call_error(self, event_name=None, context=None, **kwargs):
+        self.record(event_name, context, "error") # Connection errors and other exceptions
+
+    def before_send(self, event_name=None, request=None, **kwargs):
+        if request is None:
+            return
+        length = request.headers.get("Content-Length")
+        if length is None and isinstance(request.body, (bytes, str)):
+            length = len(request.body)
+        with self.lock:
+            self.get_stats(self.operation_key(event_name)).bytes_sent += int(length or 0)
+
+    def needs_retry(self, event_name=None, response=None, **kwargs):
+        if not response:
+            return
+        http_response, parsed = response
+        code = (parsed or {}).get("Error", {}).get("Code")
+        if code in THROTTLE_ERROR_CODES or getattr(http_response, "status_code", None) == 429:
+            with self.lock:
+                self.get_stats(self.operation_key(event_name)).throttles += 1
+
+    def summary_rows(self):
+        with self.lock:
+            return sorted(self.stats.items(), key=lambda item: item[1].total_seconds, reverse=True)
+
+    def print_summary(self, stream=None):
+        """Prints one row per operation, slowest total first (to stderr by default, so stdout output stays clean)."""
+        stream = stream or sys.stderr
+        rows = self.summary_rows()
+        if not rows:
+            print("\nNo AWS API calls were made.", file=stream)
+            return
+
+        total_calls = sum(stats.calls for _, stats in rows)
+        total_seconds = sum(stats.total_seconds for _, stats in rows)
+        print(f"\nAWS API calls: {total_calls} calls, {total_seconds:.2f}s spent in calls, "
+              f"{time.perf_counter() - self.started:.2f}s wall time", file=stream)
+
+        header = f"{'SERVICE':<16}{'OPERATION':<30}{'CALLS':>7}{'ERRORS':>7}{'RETRIES':>8}{'THROTTLED':>10}" \
+                 f"{'SENT KB':>10}{'RECV KB':>10}{'AVG ms':>9}{'P95 ms':>9}{'MAX ms':>9}{'TOTAL s':>9}"
+        print(header, file=stream)
+        print("-" * len(header), file=stream)
+
+        for (service, operation), stats in rows:
+            print(f"{service[:15]:<16}{operation[:29]:<30}{stats.calls:>7}{stats.errors:>7}{stats.retries:>8}"
+                  f"{stats.throttles:>10}{stats.bytes_sent / 1024:>10.1f}{stats.bytes_received / 1024:>10.1f}"
+                  f"{stats.total_seconds / max(1, stats.calls) * 1000:>9.1f}{stats.percentile(0.95) * 1000:>9.1f}"
+                  f"{stats.max_seconds * 1000:>9.1f}{stats.total_seconds:>9.2f}", file=stream)
+
+    def write_prometheus(self, path, command=None):
+        """
+        Writes the metrics in the Prometheus text format (e.g. for the node_exporter textfile collector).
+
+        Args:
+        - path (str): File to write. It is replaced atomically.
+        - command (str): CLI command, added as a label to every metric.
+        """
+        base_labels = f'command="{command}",' if command else ""
+        lines = []
+
+        counters = [
+            ("aws_cli_api_calls_total", "AWS API calls.", "calls"),
+            ("aws_cli_api_call_errors_total", "AWS API calls that failed.", "errors"),
+            ("aws_cli_api_call_retries_total", "Retries made by botocore.", "retries"),
+            ("aws_cli_api_call_throttles_total", "Responses that reported throttling.", "throttles"),
+            ("aws_cli_api_request_bytes_total", "Request body bytes sent.", "bytes_sent"),
+            ("aws_cli_api_response_bytes_total", "Response body bytes received.", "bytes_received"),
+        ]
+        rows = self.summary_rows()
+
+        for name, description, attribute in counters:
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+            for (service, operation), stats in rows:
+                lines.append(f'{name}{{{base_labels}service="{service}",operation="{operation}"}} {getattr(stats, attribute)}')
+
+        name = "aws_cli_api_call_duration_seconds"
+        lines += [f"# HELP {name} Latency of AWS API calls, including retries.", f"# TYPE {name} histogram"]
+        for (service, operation), stats in rows:
+            labels = f'{base_labels}service="{service}",operation="{operation}"'
+            cumulative = 0
+            for bound, count in zip([str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"], stats.histogram):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {stats.total_seconds:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {stats.calls}")
+
+        write_atomically(path, "\n".join(lines) + "\n")
+
+    def write_json(self, path, command=None):
+        """
+        Writes the summary and every traced call as JSON (e.g. for Jenkins to archive).
+
+        Args:
+        - path (str): File to write.
+        - command (str): CLI command that was traced.
+        """
+        with self.lock:
+            trace = {
+                "command": command,
+                "started_at": self.started_at,
+                "wall_seconds": round(time.perf_counter() - self.started, 6),
+                "operations": [
+                    {"service": service, "operation": operation, **stats.to_dict()}
+                    for (service, operation), stats in self.stats.items()
+                ],
+                "calls": list(self.calls),
+                "dropped_calls": self.dropped_calls,
+            }
+        write_atomically(path, json.dumps(trace, indent=2))
+
+def write_atomically(path, content):
+    """Writes a file through a temporary file, so readers never see it half-written."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        f.write(content)
+    os.replace(temp_path, path)
+
+def enable_tracing(command=None, prometheus_path=None, json_path=None):
+    """
+    Traces every AWS API call made for the rest of the process and reports them at exit.
+
+    Must run before any client is created, since botocore copies the session's handlers into each new client.
+
+    Args:
+    - command (str): CLI command being traced (used as a label in the reports).
+    - prometheus_path (str): Also write a Prometheus textfile here.
+    - json_path (str): Also write a JSON trace here.
+
+    Returns:
+    - CallTracer: The active tracer.
+    """
+    from scripts.aws_clients import get_session
+
+    tracer = CallTracer()
+    tracer.register(get_session())
+
+    def report():
+        tracer.print_summary()
+        if prometheus_path:
+            tracer.write_prometheus(prometheus_path, command)
+        if json_path:
+            tracer.write_json(json_path, command)
+
+    atexit.register(report)
+    return tracer
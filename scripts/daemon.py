@@ -0,0 +1,298 @@
+import argparse
+import contextvars
+import hashlib
+import importlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import traceback
+
+# Unix socket the daemon listens on and the CLI connects to
+SOCKET_PATH = os.getenv(
+    "CLI_SOCKET_PATH",
+    os.path.join(os.path.expanduser("~"), ".aws-resource-management", "cli.sock")
+)
+
+# Environment variables that decide which AWS account, credentials, endpoint and region a command uses,
+# and which Pulumi backend and secrets it uses. The daemon only runs commands for clients whose values match its own.
+AWS_ENV_KEYS = (
+    "AWS_PROFILE", "AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_SESSION_TOKEN",
+    "AWS_SHARED_CREDENTIALS_FILE", "AWS_CONFIG_FILE", "AWS_ENDPOINT_URL", "AWS_REGION", "AWS_DEFAULT_REGION",
+    "PULUMI_BACKEND_URL", "PULUMI_ACCESS_TOKEN", "PULUMI_CONFIG_PASSPHRASE", "PULUMI_CONFIG_PASSPHRASE_FILE",
+)
+
+# Directory of the tokens `aws sso login` writes, which the daemon's session reads when they are refreshed
+AWS_SSO_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".aws", "sso", "cache")
+
+# Prefixes of the settings the scripts read from the environment (cache TTLs, rate limits, pool sizes...).
+# Commands run with the daemon's environment, so clients whose settings differ run in-process.
+SETTING_PREFIXES = ("CLI_", "AWS_RATE_LIMIT_", "AWS_MAX_", "AWS_ENDPOINT_URL_")
+
+# Settings that only affect how the client reaches the daemon
+CLIENT_SETTINGS = ("CLI_NO_DAEMON", "CLI_SOCKET_PATH")
+
+# Commands that run Pulumi, which reads its own config, credentials and working directory from the process
+PULUMI_COMMANDS = ("create-instances", "create-bucket", "create-hosted-zone", "destroy-resources")
+
+def get_credential_files():
+    """Returns the AWS credentials and config files and the cached SSO tokens a session may read."""
+    paths = [
+        os.path.expanduser(os.getenv("AWS_SHARED_CREDENTIALS_FILE", os.path.join("~", ".aws", "credentials"))),
+        os.path.expanduser(os.getenv("AWS_CONFIG_FILE", os.path.join("~", ".aws", "config"))),
+    ]
+    try:
+        paths += sorted(os.path.join(AWS_SSO_CACHE_DIR, name) for name in os.listdir(AWS_SSO_CACHE_DIR))
+    except OSError:
+        pass # No SSO logins
+    return paths
+
+def get_environment_fingerprint():
+    """
+    Returns a hash of the AWS and Pulumi environment variables and of when the credential files last
+    changed, so the values themselves never leave the process.
+    """
+    values = [os.getenv(key, "") for key in AWS_ENV_KEYS]
+    for path in get_credential_files():
+        try:
+            values.append(f"{path}={os.stat(path).st_mtime_ns}")
+        except OSError:
+            values.append(f"{path}=missing")
+    return hashlib.sha256("\0".join(values).encode()).hexdigest()
+
+def get_settings_fingerprint():
+    """Returns a hash of every CLI setting in the environment (see SETTING_PREFIXES)."""
+    settings = sorted(
+        f"{key}={value}" for key, value in os.environ.items()
+        if key.startswith(SETTING_PREFIXES) and key not in CLIENT_SETTINGS
+    )
+    return hashlib.sha256("\0".join(settings).encode()).hexdigest()
+
+def is_daemon_supported():
+    """Unix sockets aren't available on every platform (e.g. older Windows Pythons)."""
+    return hasattr(socket, "AF_UNIX")
+
+def should_use_daemon(args):
+    """
+    Decides if a parsed command can be sent to the daemon.
+
+    Commands that prompt on the terminal, change process-wide settings or run Pulumi always run in-process.
+
+    Args:
+    - args (argparse.Namespace): Parsed CLI arguments.
+
+    Returns:
+    - bool: True if the command may run in the daemon.
+    """
+    if not is_daemon_supported() or os.getenv("CLI_NO_DAEMON", "false").lower() == "true":
+        return False
+    if args.command == "serve" or args.no_cache or args.trace_calls or args.trace_prometheus or args.trace_json:
+        return False # Process-wide settings (the daemon's clients are already created, so they can't be traced)
+    if args.command in PULUMI_COMMANDS:
+        return False # Pulumi resolves its workspace and credentials from the calling shell
+    return True
+
+class OutputRouter:
+    """
+    Tracks which client connection the running code writes for.
+
+    The connection is kept in a context variable, and the commands' thread pools copy the submitting
+    thread's context into their tasks (see `scripts.executors.ContextThreadPoolExecutor`). So output
+    from a command's worker threads goes to that command's client, even while other commands are running.
+    """
+
+    def __init__(self):
+        self.connection = contextvars.ContextVar("connection", default=None)
+
+    def attach(self, connection):
+        return self.connection.set(connection)
+
+    def detach(self, token):
+        self.connection.reset(token)
+
+    def current(self):
+        return self.connection.get()
+
+class RoutedOutput:
+    """stdout/stderr replacement that sends output to the client of the writing thread's command."""
+
+    def __init__(self, router, stream_name, fallback):
+        self.router = router
+        self.stream_name = stream_name
+        self.fallback = fallback
+
+    def write(self, text):
+        connection = self.router.current()
+        if connection is None:
+            return self.fallback.write(text)
+
+        connection.send({"type": "output", "stream": self.stream_name, "text": text})
+        return len(text)
+
+    def flush(self):
+        self.fallback.flush()
+
+    def isatty(self):
+        return False
+
+class Connection:
+    """A client connection. Messages are JSON lines, written under a lock since several threads may print."""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.lock = threading.Lock()
+
+    def send(self, message):
+        with self.lock:
+            try:
+                self.wfile.write((json.dumps(message) + "\n").encode())
+                self.wfile.flush()
+            except OSError:
+                pass # Client went away, the command still finishes
+
+class CommandHandler(socketserver.StreamRequestHandler):
+    """Runs one command per connection and streams its output back."""
+
+    def handle(self):
+        from cli import run_command
+        from scripts.helpers import clear_zone_ids
+
+        request = json.loads(self.rfile.readline())
+        connection = Connection(self.wfile)
+
+        if request.get("environment") != get_environment_fingerprint():
+            connection.send({"type": "rejected", "reason": "the daemon was started with different AWS credentials, endpoint or region"})
+            return
+        if request.get("settings") != get_settings_fingerprint():
+            connection.send({"type": "rejected", "reason": "the daemon was started with different CLI_*, AWS_RATE_LIMIT_* or AWS_MAX_* settings"})
+            return
+        if request.get("cwd") != os.getcwd():
+            connection.send({"type": "rejected", "reason": "the daemon was started in a different directory"})
+            return
+
+        router = self.server.router
+        token = router.attach(connection)
+        code = 0
+        try:
+            run_command(argparse.Namespace(**request["args"]))
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception:
+            traceback.print_exc() # sys.stderr routes the traceback to this client
+            code = 1
+        finally:
+            router.detach(token)
+            clear_zone_ids() # Zones may have been created or deleted, don't trust the in-memory IDs
+
+        connection.send({"type": "exit", "code": code})
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def warm_up():
+    """Imports every command module and resolves credentials, so the first command doesn't pay for it."""
+    from cli import COMMAND_REGISTRY
+    from scripts.aws_clients import get_session
+
+    get_session().get_credentials()
+    for module_name, _ in COMMAND_REGISTRY.values():
+        if module_name != __name__:
+            try:
+                importlib.import_module(module_name)
+            except ImportError as e:
+                print(f"Could not preload {module_name}: {e}")
+
+def serve(socket_path=None):
+    """
+    Runs the CLI daemon: keeps clients, caches and imported modules warm,
+    and runs commands sent by `cli.py` over a Unix socket until interrupted.
+
+    Args:
+    - socket_path (str): Socket to listen on. None uses CLI_SOCKET_PATH or ~/.aws-resource-management/cli.sock.
+    """
+    if not is_daemon_supported():
+        print("Error: Daemon mode needs Unix socket support, which this platform doesn't provide.")
+        return
+
+    socket_path = socket_path or SOCKET_PATH
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+
+    if os.path.exists(socket_path):
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                probe.connect(socket_path)
+            print(f"Error: A daemon is already listening on {socket_path}.")
+            return
+        except OSError:
+            os.remove(socket_path) # Left behind by a daemon that didn't shut down cleanly
+
+    previous_umask = os.umask(0o177) # Only the current user may connect
+    try:
+        server = DaemonServer(socket_path, CommandHandler)
+    finally:
+        os.umask(previous_umask)
+
+    server.router = OutputRouter()
+    sys.stdout = RoutedOutput(server.router, "stdout", sys.stdout)
+    sys.stderr = RoutedOutput(server.router, "stderr", sys.stderr)
+
+    threading.Thread(target=warm_up, daemon=True).start()
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0)) # Clean up the socket when stopped by a service manager
+    print(f"Listening on {socket_path} (Ctrl+C to stop).")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.remove(socket_path)
+        sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+        print("Daemon stopped.")
+
+def run_in_daemon(args, socket_path=None):
+    """
+    Sends a parsed command to a running daemon and streams its output to this process.
+
+    Args:
+    - args (argparse.Namespace): Parsed CLI arguments.
+    - socket_path (str): Socket of the daemon. None uses the default socket.
+
+    Returns:
+    - int: Exit code of the command.
+    - None: If no daemon accepted the command, so the caller should run it in-process.
+    """
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path or SOCKET_PATH)
+    except OSError:
+        client.close()
+        return None # No daemon running
+
+    with client, client.makefile("rwb") as connection:
+        connection.write((json.dumps({
+            "args": vars(args),
+            "environment": get_environment_fingerprint(),
+            "settings": get_settings_fingerprint(),
+            "cwd": os.getcwd(), # Relative paths (including local files to upload) resolve against it
+        }) + "\n").encode())
+        connection.flush()
+
+        for line in connection:
+            message = json.loads(line)
+            if message["type"] == "output":
+                output = sys.stderr if message.get("stream") == "stderr" else sys.stdout
+                output.write(message["text"])
+                output.flush()
+            elif message["type"] == "exit":
+                return message["code"]
+            elif message["type"] == "rejected":
+                print(f"Note: Running in-process because {message['reason']}.", file=sys.stderr)
+                return None
+
+    # The daemon stopped in the middle of the command. Running it again could repeat its side effects.
+    print("Error: The connection to the daemon was lost before the command finished.")
+    return 1
@@ -1,150 +1,409 @@
-import boto3
-from pulumi.automation import Stack, LocalWorkspace
+import threading
+import time
+from functools import partial
+from pulumi.automation import Stack, LocalWorkspace, StackNotFoundError
+from scripts.aws_clients import get_client
+from scripts.executors import ContextThreadPoolExecutor
+from scripts import inventory_cache
+from scripts.ec2_manage import INSTANCE_CHUNK_SIZE
+from scripts.helpers import (get_cli_managed_buckets, get_cli_managed_buckets_by_region, get_cli_managed_zones,
+                             iter_cli_managed_instances, DEFAULT_TAG_SCAN_WORKERS)
+from scripts.pulumi_stack import get_ec2_stack_name
+from scripts.regions import resolve_regions, run_per_region
+from scripts.route53_manage import pack_change_batches
+from scripts.task_graph import run_task_graph, print_task_summary
 
-def destroy_resources():
+PROJECT_NAME = "AWS-Resource-Management"
+
+DELETE_BATCH_SIZE = 1000 # Maximum number of keys accepted by a single delete_objects request
+DEFAULT_DELETE_WORKERS = 8 # Concurrent delete_objects requests per bucket
+RETRYABLE_DELETE_ERRORS = {"SlowDown", "InternalError", "ServiceUnavailable", "RequestTimeout"}
+
+DEFAULT_ZONE_WORKERS = 4 # Hosted zones emptied at the same time
+
+def run_in_regions(func, regions):
     """
-    Destroys all CLI-managed AWS resources (EC2 instances, S3 buckets, and Route 53 hosted zones).
+    Runs a teardown step in every region at the same time, one worker per region.
+
+    Args:
+    - func (callable): Called with a region name.
+    - regions (list): Region names.
+
+    Raises:
+    - RuntimeError: If the step failed in any region (after every region finished).
     """
+    failed_regions = []
 
-    def delete_retained_instances():
-        """Finds and deletes CLI-managed EC2 instances retained due to `retain_on_delete=True`."""
-        ec2_client = boto3.client("ec2")
+    for region, _, error in run_per_region(func, regions):
+        if error:
+            print(f"Error in {region}: {error}")
+            failed_regions.append(region)
 
-        # Filter for instances tagged as "CLI Managed"
-        filters = [{"Name": "tag:Managed", "Values": ["CLI Managed"]}]
-        response = ec2_client.describe_instances(Filters=filters)
+    if failed_regions:
+        raise RuntimeError(f"Failed in regions: {', '.join(failed_regions)}")
 
-        # Extract instance IDs
-        instance_ids = [
-            instance["InstanceId"]
-            for reservation in response["Reservations"]
-            for instance in reservation["Instances"]
-        ]
+def delete_retained_instances(region=None):
+    """
+    Finds and deletes CLI-managed EC2 instances retained due to `retain_on_delete=True`.
 
-        # Terminate instances if any are found
-        if instance_ids:
-            print(f"Manually deleting retained instances: {instance_ids}")
-            ec2_client.terminate_instances(InstanceIds=instance_ids)
-            print("Retained instances successfully deleted.")
-        else:
-            print("No retained instances found.")
+    Instances are terminated in chunks while the describe pages arrive, so a huge fleet never
+    becomes one giant request and a bad chunk doesn't stop the others.
 
-    def destroy_pulumi_stack(stack_name, project_name):
-        """Destroys a specific Pulumi stack."""
-        try:
-            # Initialize Pulumi workspace
-            workspace = LocalWorkspace(work_dir="../.venv")
-            stack = Stack.select(stack_name, workspace)
+    Raises:
+    - RuntimeError: If any chunk could not be terminated (after every chunk was tried).
+    """
+    ec2_client = get_client("ec2", region)
+    region_name = ec2_client.meta.region_name
+
+    # Only instances that still exist need to be terminated
+    instances = iter_cli_managed_instances(states=["pending", "running", "stopping", "stopped"], ec2_client=ec2_client)
+    terminated = 0
+    failed_chunks = 0
+    chunk = []
 
-            # Run Pulumi destroy command
-            stack.destroy(on_output=print)
-            print(f"Pulumi stack '{stack_name}' destroyed successfully.")
+    def terminate(chunk):
+        nonlocal terminated, failed_chunks
+        try:
+            ec2_client.terminate_instances(InstanceIds=chunk)
+            terminated += len(chunk)
+            print(f"Manually deleting {len(chunk)} retained instances in {region_name}: {chunk}")
         except Exception as e:
-            print(f"Error deleting Pulumi stack '{stack_name}': {e}")
+            failed_chunks += 1
+            print(f"Error terminating instances {chunk} in {region_name}: {e}")
 
-    # Destroy EC2 stack and delete retained instances
-    destroy_pulumi_stack("devec2", "AWS-Resource-Management")
-    delete_retained_instances()
+    for instance in instances:
+        chunk.append(instance["InstanceId"])
+        if len(chunk) == INSTANCE_CHUNK_SIZE:
+            terminate(chunk)
+            chunk = []
+    if chunk:
+        terminate(chunk)
 
-    # Destroy S3 stack and delete CLI-managed buckets
-    def destroy_all_cli_buckets():
-        """Deletes all CLI-managed S3 buckets."""
-        s3 = boto3.client("s3")
+    if failed_chunks:
+        raise RuntimeError(f"Could not terminate {failed_chunks} chunks of retained instances in {region_name}")
+    if terminated:
+        print(f"{terminated} retained instances successfully deleted in {region_name}.")
+    else:
+        print(f"No retained instances found in {region_name}.")
 
-        try:
-            # List all S3 buckets
-            response = s3.list_buckets()
-            buckets = response.get("Buckets", [])
-
-            cli_managed_buckets = []
-
-            for bucket in buckets:
-                bucket_name = bucket["Name"]
-                try:
-                    # Check bucket tags to determine if it's CLI-managed
-                    bucket_tagging = s3.get_bucket_tagging(Bucket=bucket_name)
-                    tags = {tag["Key"]: tag["Value"] for tag in bucket_tagging["TagSet"]}
-
-                    if tags.get("Managed") == "CLI Managed":
-                        cli_managed_buckets.append(bucket_name)
-                except s3.exceptions.ClientError as e:
-                    # Handle buckets without tags or already deleted buckets
-                    if e.response["Error"]["Code"] in ["NoSuchTagSet", "NoSuchBucket"]:
-                        continue  # Skip non-CLI managed or deleted buckets
-
-            if not cli_managed_buckets:
-                print("No CLI-managed buckets found.")
-                return
-
-            for bucket_name in cli_managed_buckets:
-                print(f"Deleting bucket: {bucket_name}")
-
-                # Empty the bucket before deletion
-                paginator = s3.get_paginator("list_objects_v2")
-                for page in paginator.paginate(Bucket=bucket_name):
-                    if "Contents" in page:
-                        objects = [{"Key": obj["Key"]} for obj in page["Contents"]]
-                        s3.delete_objects(Bucket=bucket_name, Delete={"Objects": objects})
-                        print(f"Emptied {len(objects)} objects from {bucket_name}.")
-
-                # Delete the empty bucket
-                s3.delete_bucket(Bucket=bucket_name)
-                print(f"Bucket {bucket_name} deleted successfully.")
+def destroy_pulumi_stack(stack_name, project_name=PROJECT_NAME):
+    """Destroys a specific Pulumi stack. A stack that was never created is not an error."""
+    try:
+        # Initialize Pulumi workspace
+        workspace = LocalWorkspace(work_dir="../.venv")
+        stack = Stack.select(stack_name, workspace)
+    except StackNotFoundError:
+        print(f"Pulumi stack '{stack_name}' not found, nothing to destroy.")
+        return
 
-        except Exception as e:
-            print(f"Error: {e}")
+    # Run Pulumi destroy command
+    stack.destroy(on_output=print)
+    print(f"Pulumi stack '{stack_name}' destroyed successfully.")
+
+def iter_delete_batches(s3, bucket_name):
+    """
+    Lists every object version and delete marker of a bucket in batches ready for `delete_objects`.
+
+    Unversioned buckets return their objects with the "null" version ID, so this covers them too.
 
-    # Destroy all CLI-managed S3 buckets
-    destroy_all_cli_buckets()
-    destroy_pulumi_stack("devs3", "AWS-Resource-Management")
+    Args:
+    - s3: S3 client.
+    - bucket_name (str): The name of the S3 bucket.
 
-    def destroy_route53_resources():
-        """Deletes all CLI-managed Route 53 hosted zones."""
-        client = boto3.client("route53")
+    Yields:
+    - list: Up to DELETE_BATCH_SIZE {"Key", "VersionId"} dicts.
+    """
+    batch = []
+    paginator = s3.get_paginator("list_object_versions")
+
+    for page in paginator.paginate(Bucket=bucket_name, PaginationConfig={"PageSize": DELETE_BATCH_SIZE}):
+        for version in page.get("Versions", []) + page.get("DeleteMarkers", []):
+            batch.append({"Key": version["Key"], "VersionId": version["VersionId"]})
+
+            if len(batch) == DELETE_BATCH_SIZE:
+                yield batch
+                batch = []
+
+    if batch:
+        yield batch
+
+def delete_batch(s3, bucket_name, batch, attempts=3):
+    """
+    Deletes a batch of object versions, retrying the keys S3 reports as temporarily failed.
 
+    Args:
+    - s3: S3 client.
+    - bucket_name (str): The name of the S3 bucket.
+    - batch (list): {"Key", "VersionId"} dicts to delete.
+    - attempts (int): Maximum number of delete_objects calls for this batch.
+
+    Returns:
+    - int: Number of versions deleted.
+    - list: Per-key errors that couldn't be resolved by retrying.
+    """
+    remaining = batch
+    deleted = 0
+    failed = []
+
+    for attempt in range(attempts):
+        # Quiet mode only reports failed keys, which keeps the responses small
+        response = s3.delete_objects(Bucket=bucket_name, Delete={"Objects": remaining, "Quiet": True})
+        errors = response.get("Errors", [])
+        deleted += len(remaining) - len(errors)
+
+        retryable = [error for error in errors if error.get("Code") in RETRYABLE_DELETE_ERRORS]
+        failed.extend(error for error in errors if error.get("Code") not in RETRYABLE_DELETE_ERRORS)
+
+        if not retryable:
+            break
+        if attempt == attempts - 1:
+            failed.extend(retryable) # Out of attempts, report the keys that are still failing
+            break
+
+        # Back off before retrying only the keys that failed temporarily
+        time.sleep(2 ** attempt)
+        remaining = [
+            {"Key": error["Key"], "VersionId": error["VersionId"]} if error.get("VersionId") else {"Key": error["Key"]}
+            for error in retryable
+        ]
+
+    return deleted, failed
+
+def empty_bucket(bucket_name, delete_workers=DEFAULT_DELETE_WORKERS, region=None):
+    """
+    Deletes every object, object version and delete marker of a bucket.
+
+    Listing feeds a pool of batch deleters, so deletion of one batch overlaps with listing
+    the next ones. The number of batches waiting for a deleter is bounded to keep memory flat.
+
+    Args:
+    - bucket_name (str): The name of the S3 bucket.
+    - delete_workers (int): Number of concurrent delete_objects requests.
+    - region (str): Region of the bucket. None uses the default region.
+
+    Returns:
+    - list: Per-key errors for versions that couldn't be deleted.
+    """
+    s3 = get_client("s3", region)
+    slots = threading.BoundedSemaphore(delete_workers * 2) # Batches listed but not yet deleted
+    lock = threading.Lock()
+    progress = {"deleted": 0, "errors": [], "last_report": time.perf_counter()}
+    start = time.perf_counter()
+
+    def worker(batch):
         try:
-            # List all hosted zones
-            response = client.list_hosted_zones()
-            cli_managed_zones = []
-
-            for zone in response["HostedZones"]:
-                zone_id = zone["Id"].split("/")[-1]
-
-                # Fetch tags for each hosted zone
-                tag_response = client.list_tags_for_resource(ResourceType="hostedzone", ResourceId=zone_id)
-                tags = {tag["Key"]: tag["Value"] for tag in tag_response["ResourceTagSet"]["Tags"]}
-
-                if tags.get("Managed") == "CLI Managed":
-                    cli_managed_zones.append((zone_id, zone["Name"]))
-
-            if not cli_managed_zones:
-                print("No CLI-managed hosted zones found.")
-                return
-
-            for zone_id, zone_name in cli_managed_zones:
-                print(f"Deleting hosted zone: {zone_name}")
-
-                # List and delete all DNS records except NS and SOA (required by AWS)
-                record_sets = client.list_resource_record_sets(HostedZoneId=zone_id)
-                for record in record_sets["ResourceRecordSets"]:
-                    if record["Type"] not in ["NS", "SOA"]:
-                        client.change_resource_record_sets(
-                            HostedZoneId=zone_id,
-                            ChangeBatch={
-                                "Changes": [
-                                    {"Action": "DELETE", "ResourceRecordSet": record}
-                                ]
-                            },
-                        )
-                        print(f"Deleted record: {record['Name']} ({record['Type']})")
-
-                # Delete the hosted zone
-                client.delete_hosted_zone(Id=zone_id)
-                print(f"Hosted zone '{zone_name}' deleted successfully.")
+            deleted, errors = delete_batch(s3, bucket_name, batch)
+        finally:
+            slots.release()
 
-        except Exception as e:
-            print(f"Error deleting Route 53 hosted zones: {e}")
+        with lock:
+            progress["deleted"] += deleted
+            progress["errors"].extend(errors)
+
+            # Report progress at most every 2 seconds
+            now = time.perf_counter()
+            if now - progress["last_report"] >= 2:
+                progress["last_report"] = now
+                rate = progress["deleted"] / (now - start)
+                print(f"Emptied {progress['deleted']} objects from {bucket_name} ({rate:.0f} objects/s).")
+
+    with ContextThreadPoolExecutor(max_workers=max(1, delete_workers)) as executor:
+        futures = []
+        for batch in iter_delete_batches(s3, bucket_name):
+            slots.acquire() # Wait for a free slot so listing doesn't run far ahead of deletion
+            futures.append(executor.submit(worker, batch))
+
+        for future in futures:
+            future.result() # Surface request-level failures (e.g. access denied)
+
+    elapsed = time.perf_counter() - start
+    print(f"Emptied {progress['deleted']} objects from {bucket_name} in {elapsed:.1f}s.")
+
+    return progress["errors"]
+
+def delete_buckets(bucket_names, delete_workers=DEFAULT_DELETE_WORKERS, region=None):
+    """
+    Empties and deletes buckets one after another.
+
+    Args:
+    - bucket_names (list): Names of the buckets to delete.
+    - delete_workers (int): Number of concurrent delete_objects requests per bucket.
+    - region (str): Region of the buckets. None uses the default region.
+
+    Returns:
+    - list: Names of the buckets that couldn't be emptied.
+    """
+    s3 = get_client("s3", region)
+    failed_buckets = []
+
+    for bucket_name in bucket_names:
+        print(f"Deleting bucket: {bucket_name}")
+
+        # Empty the bucket (including object versions and delete markers) before deletion
+        errors = empty_bucket(bucket_name, delete_workers, region)
+        if errors:
+            for error in errors[:10]:
+                print(f"Could not delete {error['Key']} from {bucket_name}: {error.get('Code')} {error.get('Message', '')}")
+            failed_buckets.append(bucket_name)
+            continue
+
+        # Delete the empty bucket
+        s3.delete_bucket(Bucket=bucket_name)
+        print(f"Bucket {bucket_name} deleted successfully.")
+
+    return failed_buckets
+
+def destroy_all_cli_buckets(max_workers=DEFAULT_TAG_SCAN_WORKERS, delete_workers=DEFAULT_DELETE_WORKERS, regions=None):
+    """
+    Deletes all CLI-managed S3 buckets.
+
+    Args:
+    - max_workers (int): Maximum number of concurrent bucket tag requests.
+    - delete_workers (int): Number of concurrent delete_objects requests per bucket.
+    - regions (list): Only delete buckets in these regions, each region by its own worker. None deletes every bucket.
+    """
+    failed_regions = []
+
+    if regions is None:
+        # Find CLI-managed buckets by scanning their tags concurrently
+        names_by_region = {None: get_cli_managed_buckets(max_workers)}
+    else:
+        names_by_region = {}
+        for region, names, error in get_cli_managed_buckets_by_region(regions, max_workers):
+            if error:
+                print(f"Error listing buckets in {region}: {error}")
+                failed_regions.append(region)
+            names_by_region[region] = names
+
+    if not any(names_by_region.values()) and not failed_regions:
+        print("No CLI-managed buckets found.")
+        return
+
+    failed_buckets = []
+    regions_with_buckets = [region for region, names in names_by_region.items() if names]
+
+    for region, failed, error in run_per_region(lambda region: delete_buckets(names_by_region[region], delete_workers, region),
+                                                regions_with_buckets):
+        if error:
+            print(f"Error deleting buckets in {region}: {error}")
+            failed_regions.append(region)
+        else:
+            failed_buckets.extend(failed)
+
+    errors = []
+    if failed_regions:
+        errors.append(f"Could not delete buckets in regions: {', '.join(map(str, failed_regions))}")
+    if failed_buckets:
+        errors.append(f"Could not empty buckets: {', '.join(failed_buckets)}")
+    if errors:
+        raise RuntimeError("; ".join(errors))
+
+def delete_hosted_zone(zone_id, zone_name):
+    """
+    Deletes every record of a hosted zone in maximal change batches, then deletes the zone.
+
+    The apex NS and SOA records are kept because AWS requires them and removes them with the zone.
+
+    Args:
+    - zone_id (str): The hosted zone ID.
+    - zone_name (str): The hosted zone name (with the trailing dot).
+    """
+    client = get_client("route53")
+    print(f"Deleting hosted zone: {zone_name}")
+
+    deleted = 0
+    paginator = client.get_paginator("list_resource_record_sets")
+
+    # Records are deleted page by page, so even huge zones use little memory
+    for page in paginator.paginate(HostedZoneId=zone_id):
+        changes = [
+            {"Action": "DELETE", "ResourceRecordSet": record}
+            for record in page["ResourceRecordSets"]
+            if not (record["Type"] == "SOA" or (record["Type"] == "NS" and record["Name"] == zone_name))
+        ]
+
+        for batch in pack_change_batches(changes):
+            client.change_resource_record_sets(HostedZoneId=zone_id, ChangeBatch={"Changes": batch})
+            deleted += len(batch)
+
+    print(f"Deleted {deleted} records from {zone_name}.")
+
+    # Delete the hosted zone
+    client.delete_hosted_zone(Id=zone_id)
+    print(f"Hosted zone '{zone_name}' deleted successfully.")
+
+def destroy_route53_resources(zone_workers=DEFAULT_ZONE_WORKERS):
+    """Deletes all CLI-managed Route 53 hosted zones, several zones at a time."""
+    cli_managed_zones = [(zone["Id"].split("/")[-1], zone["Name"]) for zone in get_cli_managed_zones()]
+
+    if not cli_managed_zones:
+        print("No CLI-managed hosted zones found.")
+        return
+
+    failed_zones = []
+
+    # The Route 53 client shares one rate limiter, so more workers never exceed the account limit
+    with ContextThreadPoolExecutor(max_workers=max(1, zone_workers)) as executor:
+        futures = {executor.submit(delete_hosted_zone, zone_id, zone_name): zone_name
+                   for zone_id, zone_name in cli_managed_zones}
+
+        for future, zone_name in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Error deleting hosted zone '{zone_name}': {e}")
+                failed_zones.append(zone_name)
+
+    if failed_zones:
+        raise RuntimeError(f"Could not delete hosted zones: {', '.join(failed_zones)}")
+
+def destroy_resources(max_workers=DEFAULT_TAG_SCAN_WORKERS, max_parallel_tasks=3, delete_workers=DEFAULT_DELETE_WORKERS,
+                      zone_workers=DEFAULT_ZONE_WORKERS, regions=None):
+    """
+    Destroys all CLI-managed AWS resources (EC2 instances, S3 buckets, and Route 53 hosted zones).
+
+    EC2 instances and S3 buckets are torn down in every requested region at the same time,
+    one worker per region. Route 53 is global.
+
+    The teardown is a task graph: the EC2, S3 and Route 53 branches don't depend on each
+    other and run at the same time, while the steps inside each branch keep their order.
+    Every step runs even if the step before it failed, so one failure never leaves the
+    rest of the cleanup undone; all failures are reported in the summary.
+
+    Args:
+    - max_workers (int): Maximum number of concurrent bucket tag requests.
+    - max_parallel_tasks (int): Maximum number of teardown steps running at the same time.
+    - delete_workers (int): Number of concurrent delete_objects requests per bucket.
+    - zone_workers (int): Number of hosted zones emptied at the same time.
+    - regions (list): Region names or "all" (see `resolve_regions`). None tears down EC2 in the
+      default region and deletes the CLI-managed buckets of every region.
+
+    Returns:
+    - list: Summary of every step that failed or was skipped (empty if all succeeded).
+    """
+    ec2_regions = resolve_regions(regions)
+    bucket_regions = ec2_regions if regions else None
+
+    tasks = {
+        # Destroy the EC2 stacks and delete retained instances in every region
+        "ec2-stack": (partial(run_in_regions, lambda region: destroy_pulumi_stack(get_ec2_stack_name(region)), ec2_regions), []),
+        "ec2-instances": (partial(run_in_regions, delete_retained_instances, ec2_regions), [], ["ec2-stack"]),
+
+        # Delete CLI-managed buckets, then destroy the S3 stack
+        "s3-buckets": (partial(destroy_all_cli_buckets, max_workers, delete_workers, bucket_regions), []),
+        "s3-stack": (partial(destroy_pulumi_stack, "devs3"), [], ["s3-buckets"]),
+
+        # Delete CLI-managed hosted zones, then destroy the Route 53 stack
+        "route53-zones": (partial(destroy_route53_resources, zone_workers), []),
+        "route53-stack": (partial(destroy_pulumi_stack, "dev53"), [], ["route53-zones"]),
+    }
+
+    try:
+        results = run_task_graph(tasks, max_parallel_tasks)
+    finally:
+        # Every cached resource may have been deleted
+        inventory_cache.invalidate()
+
+    print_task_summary(results)
 
-    # Destroy all CLI-managed Route 53 hosted zones
-    destroy_route53_resources()
-    destroy_pulumi_stack("dev53", "AWS-Resource-Management")
\ No newline at end of file
+    return [result for result in results if result["status"] != "succeeded"]
@@ -1,40 +1,65 @@
+import os
+import time
 import pulumi
 import pulumi_aws as aws
-import pulumi.automation as auto
 from pulumi import ResourceOptions
-from scripts.helpers import get_latest_ami, get_cli_managed_instances  # Helper function to get AMI
-import time  # For unique stack naming
+from scripts.helpers import get_latest_ami, get_instance_architecture, count_cli_managed_instances  # Helper function to get AMI
+from scripts.pulumi_stack import prepare_stack, deploy_stack, get_ec2_stack_name
+from scripts.regions import get_default_region, HOME_REGION
 
-def pulumi_program(instance_type, os_type, count, existing_instance_count, existing_instance_ids):
+# Network placement of new instances. These defaults belong to the home region; other regions use
+# their default VPC unless CLI_SUBNET_ID / CLI_SECURITY_GROUP_ID are set.
+DEFAULT_SUBNET_ID = "subnet-0bc094de4c29eab3b"
+DEFAULT_SECURITY_GROUP_ID = "sg-02ec2894679b09083"
+
+# Maximum number of running CLI-Managed instances (0 disables the limit)
+DEFAULT_MAX_RUNNING = int(os.getenv("CLI_MAX_RUNNING_INSTANCES", "2"))
+
+def get_network_settings(region):
     """
-    Pulumi program that provisions new EC2 instances while preserving existing ones.
+    Returns the subnet and security groups new instances are placed in.
 
     Args:
-    - instance_type (str): The instance type (e.g., t3.nano or t4g.nano)
-    - os_type (str): The OS for the instance (e.g., amazon-linux or ubuntu)
-    - count (int): Number of new instances to create
-    - existing_instance_count (int): Total CLI-managed instances count
-    - existing_instance_ids (list): List of existing instance IDs
+    - region (str): Deployment region.
+
+    Returns:
+    - dict: Keyword arguments for `aws.ec2.Instance` (empty to use the default VPC).
     """
+    subnet_id = os.getenv("CLI_SUBNET_ID") or (DEFAULT_SUBNET_ID if region == HOME_REGION else None)
+    security_group_id = os.getenv("CLI_SECURITY_GROUP_ID") or (DEFAULT_SECURITY_GROUP_ID if region == HOME_REGION else None)
+
+    settings = {}
+    if subnet_id:
+        settings["subnet_id"] = subnet_id
+    if security_group_id:
+        settings["vpc_security_group_ids"] = [security_group_id]
+    return settings
 
-    # Determine architecture based on instance type
-    arch = "x86_64" if instance_type == "t3.nano" else "arm64"
+def pulumi_program(instance_type, ami_id, count, first_instance_number, existing_instance_ids, region=HOME_REGION):
+    """
+    Pulumi program that provisions new EC2 instances while preserving existing ones.
 
-    # Get the latest AMI based on the OS and architecture
-    ami_id = get_latest_ami(os_type, arch)
+    Args:
+    - instance_type (str): The instance type (e.g., t3.nano or m7g.large)
+    - ami_id (str): The AMI resolved by `get_latest_ami`
+    - count (int): Number of new instances to create
+    - first_instance_number (int): Number used in the name of the first new instance
+    - existing_instance_ids (list): List of instance IDs created by previous runs
+    - region (str): Deployment region
+    """
+    network = get_network_settings(region)
 
     instances = []
 
     for i in range(count):
-        # Ensure unique instance names by incrementing instance count
-        instance_number = existing_instance_count + i + 1
+        # Ensure unique instance names by continuing from the last number handed out
+        instance_number = first_instance_number + i
 
         # Create EC2 instance with specified configurations
         instance = aws.ec2.Instance(f"instance-{instance_number}",
                                     instance_type=instance_type,
                                     ami=ami_id,
-                                    subnet_id="subnet-0bc094de4c29eab3b",
-                                    vpc_security_group_ids=["sg-02ec2894679b09083"],
+                                    **network,
                                     tags={
                                         "Name": f"elad-sopher-Instance-{instance_number}",
                                         "Owner": "eladsopher",
@@ -43,51 +68,103 @@ def pulumi_program(instance_type, os_type, count, existing_instance_count, exist
                                     opts=ResourceOptions(retain_on_delete=True)) # Prevent instance from being deleted on stack destroy
         instances.append(instance)
 
-    # Export instance IDs (including existing ones) for tracking
+    # Export instance IDs (including existing ones) and the next free number for the next run
     pulumi.export("instance_ids", existing_instance_ids + [inst.id for inst in instances])
+    pulumi.export("next_instance_number", first_instance_number + count)
+
+def get_previous_outputs(stack, region=None):
+    """
+    Reads the instance IDs and the next instance number exported by the previous run.
+
+    Stacks created before `next_instance_number` was exported fall back to counting
+    the existing CLI-managed instances once.
+
+    Args:
+    - stack (auto.Stack): The EC2 stack.
+    - region (str): Region of the stack.
+
+    Returns:
+    - list: Instance IDs created by previous runs.
+    - int: Number to use in the name of the next instance.
+    """
+    outputs = stack.outputs()
+    existing_instance_ids = list(outputs["instance_ids"].value) if "instance_ids" in outputs else []
 
-def create_instance(instance_type, os_type, count):
+    if "next_instance_number" in outputs:
+        return existing_instance_ids, int(outputs["next_instance_number"].value)
+
+    return existing_instance_ids, count_cli_managed_instances(["pending", "running", "stopping", "stopped"], region) + 1
+
+def create_instance(instance_type, os_type, count, ami_source="search", ami_ttl=None, refresh_ami=False,
+                    parallel=None, refresh=False, max_running=None, region=None):
     """
-    Uses Pulumi Automation API to create EC2 instances with enforced rules:
-    - Maximum 2 running CLI-Managed instances at a time.
+    Uses Pulumi Automation API to create a fleet of EC2 instances in a single `pulumi up`, with enforced rules:
+    - At most `max_running` running CLI-Managed instances at a time in the region (2 by default).
     - Stopped instances do not count towards the limit.
-    - If 1 instance is running, the user can only create 1 more.
-    - If 2 instances are running, block creation.
+    - If the limit would be exceeded, only the instances that still fit are created.
+    - If the limit is already reached, block creation.
 
     Args:
     - instance_type (str): EC2 instance type
     - os_type (str): OS for the instance
-    - count (int): Number of instances to create (max 2 allowed)
+    - count (int): Number of instances to create
+    - ami_source (str): "search" to search the official images, or "ssm" to use the public SSM parameters
+    - ami_ttl (float): Seconds a cached AMI ID stays valid
+    - refresh_ami (bool): Resolve the AMI again instead of using the cached one
+    - parallel (int): Maximum number of resource operations Pulumi runs at once
+    - refresh (bool): Refresh the stack state from AWS before deploying
+    - max_running (int): Maximum number of running CLI-Managed instances (0 disables the limit).
+      None uses CLI_MAX_RUNNING_INSTANCES (default 2).
+    - region (str): Deployment region. None uses the default region.
     """
 
-    # Fetch existing CLI-managed instances and count running ones
-    existing_instance_ids, running_count = get_cli_managed_instances()
+    if max_running is None:
+        max_running = DEFAULT_MAX_RUNNING
+    region = region or get_default_region()
+
+    timings = {}
+    start = time.perf_counter()
+
+    if max_running > 0:
+        # Count running CLI-managed instances on the server side, without listing every instance
+        running_count = count_cli_managed_instances(["pending", "running"], region)
+
+        # Enforce instance creation rules
+        if running_count >= max_running:
+            print(f"Error: Cannot create new instances. There are already {running_count} running CLI-Managed instances "
+                  f"(limit {max_running}).")
+            return
+        elif running_count + count > max_running:
+            print(f"Warning: You can only create {max_running - running_count} more instances "
+                  f"since {running_count} are already running.")
+            count = max_running - running_count  # Limit count to prevent exceeding the max
+
+    timings["Quota check"] = time.perf_counter() - start
+    start = time.perf_counter()
 
-    # Enforce instance creation rules
-    if running_count >= 2:
-        print("Error: Cannot create new instances. There are already 2 running CLI-Managed instances.")
-        return
-    elif running_count == 1 and count > 1:
-        print("Warning: You can only create 1 more instance since 1 is already running.")
-        count = 1  # Limit count to 1 to prevent exceeding the max
+    # Select the Pulumi stack, installing the AWS plugin and setting the region only if needed
+    stack = prepare_stack(get_ec2_stack_name(region), region=region, plugins=[("aws", "v5")])
+    existing_instance_ids, first_instance_number = get_previous_outputs(stack, region)
 
-    # Define Pulumi project and stack names
-    project_name = "AWS-Resource-Management"
-    stack_name = "devec2"
+    timings["Stack preparation"] = time.perf_counter() - start
+    start = time.perf_counter()
 
-    # Create or select the Pulumi stack
-    stack = auto.create_or_select_stack(
-        stack_name=stack_name,
-        project_name=project_name,
-        program=lambda: pulumi_program(instance_type, os_type, count, len(existing_instance_ids), existing_instance_ids),
-    )
+    # Resolve the AMI before deploying, so its time isn't counted in the deployment too
+    arch = get_instance_architecture(instance_type, region)
+    ami_id = get_latest_ami(os_type, arch, region, ami_source, ami_ttl, refresh_ami)
 
-    print("Installing dependencies...")
-    stack.workspace.install_plugin("aws", "v5") # Ensure AWS provider plugin is installed
+    timings["AMI resolution"] = time.perf_counter() - start
 
-    print("Setting AWS region...")
-    stack.set_config("aws:region", auto.ConfigValue("us-east-1")) # Set deployment region
+    def program():
+        pulumi_program(instance_type, ami_id, count, first_instance_number, existing_instance_ids, region)
 
-    print("Running `pulumi up`...")
-    stack.up(on_output=print)  # Deploy instances via Pulumi
+    print(f"Running `pulumi up` for {count} instances in {region}...")
+    start = time.perf_counter()
+    try:
+        deploy_stack(stack, program, parallel, refresh)  # Deploy all instances via a single Pulumi update
+    finally:
+        timings["Deployment"] = time.perf_counter() - start
 
+        print("\nStage timings:")
+        for stage, seconds in timings.items():
+            print(f" - {stage:<18} {seconds:>8.2f}s")
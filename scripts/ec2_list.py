@@ -1,52 +1,107 @@
-import boto3
+import queue
+import threading
+from scripts.aws_clients import get_client
+from scripts.executors import ContextThreadPoolExecutor
+from scripts.helpers import iter_cli_managed_instances
+from scripts.output import RecordWriter
+from scripts.regions import resolve_regions
 
-def list_instances():
+# Record fields and their table column widths
+INSTANCE_FIELDS = [
+    ("region", 14),
+    ("instance_id", 19),
+    ("name", 28),
+    ("type", 12),
+    ("state", 8),
+    ("public_ip", 15),
+    ("private_ip", 15),
+]
+
+def iter_region_instances(region):
+    """Yields the running/stopped CLI-managed instances owned by "eladsopher" in one region."""
+    return iter_cli_managed_instances(states=["running", "stopped"], owner="eladsopher",
+                                      ec2_client=get_client("ec2", region))
+
+REGION_BUFFER_SIZE = 1000 # Instances buffered per region while an earlier region is still being written
+
+def put(buffer, item, stopped):
+    """Puts an item into a bounded buffer, waiting while it is full. Returns False if the listing stopped."""
+    while not stopped.is_set():
+        try:
+            buffer.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def fill_buffer(region, buffer, stopped):
+    """Scans a region into a bounded buffer, then adds None, or the error if the scan failed."""
+    try:
+        for instance in iter_region_instances(region):
+            if not put(buffer, instance, stopped):
+                return # Nobody reads the buffer anymore
+        end = None
+    except Exception as e:
+        end = e
+    put(buffer, end, stopped)
+
+def drain(buffer):
+    """Yields the instances of a buffer filled by `fill_buffer`, raising the scan's error if it failed."""
+    while (item := buffer.get()) is not None:
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+def to_record(region, instance):
+    """Converts an instance description into an output record."""
+    return {
+        "region": region,
+        "instance_id": instance["InstanceId"],
+        "name": next((tag["Value"] for tag in instance.get("Tags", []) if tag["Key"] == "Name"), None),
+        "type": instance["InstanceType"],
+        "state": instance["State"]["Name"],
+        "public_ip": instance.get("PublicIpAddress"), # None for instances without a public IP
+        "private_ip": instance.get("PrivateIpAddress"),
+    }
+
+def list_instances(regions=None, output_format="table"):
     """
-    Lists all EC2 instances created via the CLI using specific tags.
+    Lists all EC2 instances created via the CLI using specific tags, in one or more regions.
+
+    Every region is scanned at the same time by its own worker and client, and the regions are
+    written in the requested order as each page of results arrives. Regions that aren't being
+    written yet buffer at most REGION_BUFFER_SIZE instances, so memory stays bounded however
+    many instances they have.
+
+    Args:
+    - regions (list): Region names or "all" (see `resolve_regions`). None uses the default region.
+    - output_format (str): "table", "json", "ndjson" or "csv".
+
+    Returns:
+    - list: Error records (empty if every region was listed).
     """
-    ec2 = boto3.client("ec2")
 
-    # Define the tag filters to only retrieve CLI-managed instances owned by "eladsopher"
-    filters = [
-        {"Name": "tag:Managed", "Values": ["CLI Managed"]},
-        {"Name": "tag:Owner", "Values": ["eladsopher"]},
-        {"Name": "instance-state-name", "Values": ["running", "stopped"]}, # Only include running/stopped instances
-    ]
+    with RecordWriter(output_format, INSTANCE_FIELDS, "No managed instances found.") as writer:
+        regions = resolve_regions(regions)
 
-    try:
-        response = ec2.describe_instances(Filters=filters)
-        instances = []
-
-        # Iterate through all instances returned by the AWS response
-        for reservation in response["Reservations"]:
-            for instance in reservation["Instances"]:
-                instance_id = instance["InstanceId"]
-                instance_type = instance["InstanceType"]
-                state = instance["State"]["Name"]
-                public_ip = instance.get("PublicIpAddress", "N/A") # Handle instances without a public IP
-                private_ip = instance.get("PrivateIpAddress", "N/A") # Handle instances without a private IP
-
-                # Store instance details in a structured format
-                instances.append({
-                    "Instance ID": instance_id,
-                    "Type": instance_type,
-                    "State": state,
-                    "Public IP": public_ip,
-                    "Private IP": private_ip,
-                })
-
-        # Print the instance details if any are found
-        if instances:
-            print("\nList of Managed EC2 Instances:")
-            for inst in instances:
-                print(f"\nInstance ID: {inst['Instance ID']}")
-                print(f"Type: {inst['Type']}")
-                print(f"State: {inst['State']}")
-                print(f"Public IP: {inst['Public IP']}")
-                print(f"Private IP: {inst['Private IP']}")
-                print("-" * 40) # Separator for better readability
-        else:
-            print("No managed instances found.")
+        buffers = {region: queue.Queue(maxsize=REGION_BUFFER_SIZE) for region in regions[1:]}
+        stopped = threading.Event()
 
-    except Exception as e:
-        print(f"Error retrieving instances: {e}") # Print error details if the API call fails
+        with ContextThreadPoolExecutor(max_workers=max(1, len(regions) - 1)) as executor:
+            # Scan the other regions in the background while the first one streams
+            for region, buffer in buffers.items():
+                executor.submit(fill_buffer, region, buffer, stopped)
+
+            try:
+                for region in regions:
+                    try:
+                        instances = drain(buffers[region]) if region in buffers else iter_region_instances(region)
+                        for instance in instances:
+                            writer.write(to_record(region, instance))
+                    except Exception as e:
+                        writer.error(f"Could not retrieve instances: {e}", region=region) # Record the failed region
+                    writer.flush()
+            finally:
+                stopped.set() # Release the scans if writing failed, so the pool can shut down
+
+    return writer.errors
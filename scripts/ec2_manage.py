@@ -1,50 +1,129 @@
-import boto3
-from scripts.helpers import is_cli_managed_instance
+from scripts.aws_clients import get_client
+from scripts.executors import ContextThreadPoolExecutor
+from scripts.helpers import iter_cli_managed_instances
 
-def start_instance(instance_id):
+INSTANCE_CHUNK_SIZE = 100 # Instance IDs sent per start/stop request
+FILTER_VALUES_LIMIT = 200 # Maximum values in a single describe_instances filter
+DEFAULT_WAIT_WORKERS = 8 # Chunks polled at the same time while waiting for the target state
+
+# Per action: API call, response key, verb for messages, and waiter for the target state
+ACTIONS = {
+    "start": ("start_instances", "StartingInstances", "Starting", "instance_running"),
+    "stop": ("stop_instances", "StoppingInstances", "Stopping", "instance_stopped"),
+}
+
+def resolve_managed_instances(instance_ids=None, tags=None):
     """
-    Starts a specific EC2 instance if it is CLI managed.
+    Verifies ownership of many instances with one paginated, filtered describe.
+
+    Args:
+    - instance_ids (list): Instance IDs requested by the user.
+    - tags (dict): Tag selector; every CLI-managed instance with these tag values is included.
 
-    :param instance_id: The ID of the instance to start.
+    Returns:
+    - list: IDs of the CLI-managed instances that exist.
+    - list: Requested IDs that are not CLI-managed or don't exist.
     """
+    states = ["pending", "running", "stopping", "stopped"]
 
-    # Verify that the instance is CLI-managed before starting it
-    if not is_cli_managed_instance(instance_id):
-        print(f"Error: Instance {instance_id} is not CLI managed or does not exist.")
-        return
+    if instance_ids:
+        # EC2 accepts up to 200 values per filter, so large ID lists are described in groups
+        id_groups = [instance_ids[i:i + FILTER_VALUES_LIMIT] for i in range(0, len(instance_ids), FILTER_VALUES_LIMIT)]
+    else:
+        id_groups = [None]
 
-    ec2 = boto3.client("ec2")
-    try:
-        # Attempt to start the instance
-        response = ec2.start_instances(InstanceIds=[instance_id])
+    managed_ids = [
+        instance["InstanceId"]
+        for id_group in id_groups
+        for instance in iter_cli_managed_instances(states=states, instance_ids=id_group, tags=tags)
+    ]
+    found = set(managed_ids)
+    rejected_ids = [instance_id for instance_id in instance_ids or [] if instance_id not in found]
 
-        for instance in response["StartingInstances"]:
-            print(f"Starting instance: {instance['InstanceId']} (Previous state: {instance['PreviousState']['Name']})")
+    return managed_ids, rejected_ids
 
-    except Exception as e:
-        print(f"Error starting instance {instance_id}: {e}") # Handle any API errors
+def wait_for_state(instance_ids, waiter_name, max_workers=DEFAULT_WAIT_WORKERS):
+    """
+    Polls the whole set of instances concurrently until they reach the target state.
 
+    Args:
+    - instance_ids (list): Instances to wait for.
+    - waiter_name (str): boto3 EC2 waiter (e.g. "instance_running").
+    - max_workers (int): Number of chunks polled at the same time.
+    """
+    ec2 = get_client("ec2")
+    chunks = [instance_ids[i:i + INSTANCE_CHUNK_SIZE] for i in range(0, len(instance_ids), INSTANCE_CHUNK_SIZE)]
+
+    def wait(chunk):
+        ec2.get_waiter(waiter_name).wait(InstanceIds=chunk, WaiterConfig={"Delay": 5, "MaxAttempts": 120})
+
+    with ContextThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        list(executor.map(wait, chunks)) # Raises if any chunk never reaches the state
 
-def stop_instance(instance_id):
+def manage_instances(action, instance_ids=None, tags=None, wait=False):
     """
-    Stops a specific EC2 instance if it is CLI managed.
+    Starts or stops many CLI-managed EC2 instances, selected by ID and/or by tag.
 
-    :param instance_id: The ID of the instance to stop.
+    Ownership is verified with one batched describe, then the instances are started or
+    stopped in chunks instead of one API call per instance.
+
+    Args:
+    - action (str): "start" or "stop".
+    - instance_ids (list): IDs of the instances to manage.
+    - tags (dict): Tag selector (e.g. {"Env": "dev"}) for the instances to manage.
+    - wait (bool): Wait until every instance reached the target state.
     """
+    api_call, response_key, verb, waiter_name = ACTIONS[action]
 
-    # Verify that the instance is CLI-managed before stopping it
-    if not is_cli_managed_instance(instance_id):
+    if not instance_ids and not tags:
+        print("Error: Provide at least one instance ID or a tag selector.")
+        return
+
+    # Verify that the instances are CLI-managed before managing them
+    managed_ids, rejected_ids = resolve_managed_instances(instance_ids, tags)
+    for instance_id in rejected_ids:
         print(f"Error: Instance {instance_id} is not CLI managed or does not exist.")
+
+    if not managed_ids:
+        print("No CLI managed instances to manage.")
         return
 
-    ec2 = boto3.client("ec2")
-    try:
-        # Attempt to stop the instance
-        response = ec2.stop_instances(InstanceIds=[instance_id])
+    ec2 = get_client("ec2")
+    accepted_ids = [] # Instances EC2 actually started/stopped, the only ones worth waiting for
+    for i in range(0, len(managed_ids), INSTANCE_CHUNK_SIZE):
+        chunk = managed_ids[i:i + INSTANCE_CHUNK_SIZE]
+        try:
+            # Attempt to start/stop the whole chunk with a single request
+            response = getattr(ec2, api_call)(InstanceIds=chunk)
+
+            for instance in response[response_key]:
+                accepted_ids.append(instance["InstanceId"])
+                print(f"{verb} instance: {instance['InstanceId']} (Previous state: {instance['PreviousState']['Name']})")
+
+        except Exception as e:
+            print(f"Error {verb.lower()} instances {chunk}: {e}") # Handle any API errors
+
+    if wait and accepted_ids:
+        print(f"Waiting for {len(accepted_ids)} instances to reach the target state...")
+        wait_for_state(accepted_ids, waiter_name)
+        print(f"All {len(accepted_ids)} instances reached the target state.")
 
-        for instance in response["StoppingInstances"]:
-            print(f"Stopping instance: {instance['InstanceId']} (Previous state: {instance['PreviousState']['Name']})")
+def start_instances(instance_ids=None, tags=None, wait=False):
+    """
+    Starts CLI managed EC2 instances selected by ID and/or by tag.
 
-    except Exception as e:
-        print(f"Error stopping instance {instance_id}: {e}")
+    :param instance_ids: IDs of the instances to start.
+    :param tags: Tag selector for the instances to start.
+    :param wait: Wait until every instance is running.
+    """
+    manage_instances("start", instance_ids, tags, wait)
 
+def stop_instances(instance_ids=None, tags=None, wait=False):
+    """
+    Stops CLI managed EC2 instances selected by ID and/or by tag.
+
+    :param instance_ids: IDs of the instances to stop.
+    :param tags: Tag selector for the instances to stop.
+    :param wait: Wait until every instance is stopped.
+    """
+    manage_instances("stop", instance_ids, tags, wait)
@@ -0,0 +1,13 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    Thread pool whose tasks run in a copy of the submitting thread's context.
+
+    Context variables set by the caller (e.g. the daemon's client connection, see `scripts.daemon.OutputRouter`)
+    stay visible in the worker threads, so their output goes to the command that started them.
+    """
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
@@ -1,23 +1,37 @@
-import pulumi_aws as aws
-import boto3
+import botocore.exceptions
 import re
+import sys
+import threading
+from scripts.aws_clients import get_client, get_session
+from scripts.executors import ContextThreadPoolExecutor
+from scripts import inventory_cache, name_allocator
 
 # ============================
 # EC2 related functions
 # ============================
 
-def get_latest_ami(os_type, arch):
+# Public SSM parameters that always point to the latest official AMIs
+AMI_SSM_PARAMETERS = {
+    ("amazon-linux", "x86_64"): "/aws/service/ami-amazon-linux-latest/amzn2-ami-hvm-x86_64-gp2",
+    ("amazon-linux", "arm64"): "/aws/service/ami-amazon-linux-latest/amzn2-ami-hvm-arm64-gp2",
+    ("ubuntu", "x86_64"): "/aws/service/canonical/ubuntu/server/22.04/stable/current/amd64/hvm/ebs-gp2/ami-id",
+    ("ubuntu", "arm64"): "/aws/service/canonical/ubuntu/server/22.04/stable/current/arm64/hvm/ebs-gp2/ami-id",
+}
+
+def search_latest_ami(os_type, arch):
     """
-    Retrieves the latest AMI ID for the given OS and architecture.
+    Searches the official images for the latest AMI ID for the given OS and architecture.
 
     Args:
     - os_type (str): OS type ('amazon-linux' or 'ubuntu')
-    - architecture (str): CPU architecture ('x86_64' or 'arm64')
+    - arch (str): CPU architecture ('x86_64' or 'arm64')
 
     Returns:
     - str: AMI ID of the latest image
     """
 
+    import pulumi_aws as aws # Imported lazily so commands that only use boto3 helpers start faster
+
     if os_type == "amazon-linux":
         # Fetch the most recent Amazon Linux 2 AMI
         ami = aws.ec2.get_ami(
@@ -41,89 +55,213 @@ def get_latest_ami(os_type, arch):
 
     return ami.id # Return the AMI ID
 
-def get_cli_managed_instances():
+def get_latest_ami(os_type, arch, region=None, source="search", ttl=None, refresh=False):
     """
-    Fetches all CLI-managed EC2 instances (both running and stopped).
+    Retrieves the latest AMI ID for the given OS and architecture, using a cache shared between CLI runs.
+
+    Args:
+    - os_type (str): OS type ('amazon-linux' or 'ubuntu')
+    - arch (str): CPU architecture ('x86_64' or 'arm64')
+    - region (str): Region the AMI is resolved in. None uses the default region.
+    - source (str): "search" to search the official images, or "ssm" to read the public SSM parameter (faster).
+    - ttl (float): Seconds a cached AMI ID stays valid. None uses CLI_CACHE_TTL_AMI (default 1 day).
+    - refresh (bool): Ignore the cached AMI ID and resolve it again.
 
     Returns:
-    - list: List of CLI-managed instance IDs.
-    - int: Count of running CLI-managed instances.
+    - str: AMI ID of the latest image
     """
-    ec2_client = boto3.client("ec2")
+    region = region or get_session().region_name
+    cache_key = f"{os_type}:{arch}:{region}:{source}" # The sources can resolve to different images
 
-    # Filter instances that are tagged as 'CLI Managed'
-    filters = [{"Name": "tag:Managed", "Values": ["CLI Managed"]}]
-    response = ec2_client.describe_instances(Filters=filters)
+    if not refresh:
+        cached = inventory_cache.get_lookup("ami", cache_key, ttl)
+        if cached:
+            return cached
 
-    # Extract instances from the response
-    instances = [
-        instance for reservation in response["Reservations"] for instance in reservation["Instances"]
-    ]
+    if source == "ssm":
+        ssm = get_client("ssm", region)
+        ami_id = ssm.get_parameter(Name=AMI_SSM_PARAMETERS[(os_type, arch)])["Parameter"]["Value"]
+    else:
+        ami_id = search_latest_ami(os_type, arch)
 
-    # Count how many instances are currently running
-    running_instances = [inst for inst in instances if inst["State"]["Name"] == "running"]
+    inventory_cache.put_lookup("ami", cache_key, ami_id)
+    return ami_id
 
-    return [inst["InstanceId"] for inst in instances], len(running_instances)
+def get_instance_architecture(instance_type, region=None):
+    """
+    Looks up the CPU architecture of an instance type (cached between CLI runs).
+
+    Args:
+    - instance_type (str): EC2 instance type (e.g. "t3.nano" or "m7g.large").
+    - region (str): Region to query. None uses the default region.
 
-def is_cli_managed_instance(instance_id):
+    Returns:
+    - str: "arm64" or "x86_64".
+    """
+    region = region or get_session().region_name
+    cache_key = f"{instance_type}:{region}"
+
+    cached = inventory_cache.get_lookup("instance-type", cache_key)
+    if cached:
+        return cached
+
+    ec2 = get_client("ec2", region)
+    response = ec2.describe_instance_types(InstanceTypes=[instance_type]) # Fails for unknown instance types
+    architectures = response["InstanceTypes"][0]["ProcessorInfo"]["SupportedArchitectures"]
+    arch = "arm64" if "arm64" in architectures and "x86_64" not in architectures else "x86_64"
+
+    inventory_cache.put_lookup("instance-type", cache_key, arch)
+    return arch
+
+def iter_cli_managed_instances(states=None, owner=None, ec2_client=None, instance_ids=None, tags=None):
     """
-    Checks if the given instance is managed by the CLI (has the 'CLI Managed' tag).
+    Yields CLI-managed EC2 instances page by page as AWS returns them.
+
+    The tag and state filters are sent to the server, so only matching instances are
+    transferred, and only one page is held in memory at a time.
 
     Args:
-    - instance_id (str): The ID of the EC2 instance to check.
+    - states (list): Instance states to include (e.g. ["running", "stopped"]). None includes all states.
+    - owner (str): Only include instances with this 'Owner' tag. None includes every owner.
+    - ec2_client: EC2 client to use. The shared client is used if not provided.
+    - instance_ids (list): Only include these instance IDs. None includes every instance.
+    - tags (dict): Only include instances with all of these tag values.
+
+    Yields:
+    - dict: Instance description as returned by `describe_instances`.
+    """
+    ec2_client = ec2_client or get_client("ec2")
+
+    # Filter instances that are tagged as 'CLI Managed'
+    filters = [{"Name": "tag:Managed", "Values": ["CLI Managed"]}]
+    if owner:
+        filters.append({"Name": "tag:Owner", "Values": [owner]})
+    if states:
+        filters.append({"Name": "instance-state-name", "Values": list(states)})
+    if instance_ids:
+        # A filter (instead of InstanceIds) keeps pagination working and ignores unknown IDs
+        filters.append({"Name": "instance-id", "Values": list(instance_ids)})
+    for key, value in (tags or {}).items():
+        filters.append({"Name": f"tag:{key}", "Values": [value]})
+
+    # Page through every result instead of reading only the first response
+    paginator = ec2_client.get_paginator("describe_instances")
+    for page in paginator.paginate(Filters=filters, PaginationConfig={"PageSize": 1000}):
+        for reservation in page["Reservations"]:
+            yield from reservation["Instances"]
+
+def count_cli_managed_instances(states, region=None):
+    """
+    Counts CLI-managed EC2 instances in the given states without keeping them in memory.
+
+    Args:
+    - states (list): Instance states to count (e.g. ["running"]).
+    - region (str): Region to count in. None uses the default region.
 
     Returns:
-    - bool: True if the instance is CLI-managed, False otherwise.
+    - int: Number of matching instances.
     """
+    return sum(1 for _ in iter_cli_managed_instances(states=states, ec2_client=get_client("ec2", region)))
 
-    ec2 = boto3.client("ec2")
 
-    try:
-        # Get instance details
-        response = ec2.describe_instances(InstanceIds=[instance_id])
+# ============================
+# Name allocation
+# ============================
+
+MAX_NAME_ATTEMPTS = 10 # Reserved names checked against AWS before giving up
+
+def reserve_free_name(kind, reserve_names, is_taken):
+    """
+    Reserves the next name of a kind and checks AWS that nothing uses it yet.
 
-        # Check if the 'Managed' tag exists and is set to 'CLI Managed'
-        for reservation in response["Reservations"]:
-            for instance in reservation["Instances"]:
-                for tag in instance.get("Tags", []):  # Get instance tags safely
-                    if tag["Key"] == "Managed" and tag["Value"] == "CLI Managed":
-                        return True
-    except Exception as e:
-        print(f"Error checking instance {instance_id}: {e}")
+    A taken name means the resource was created by another tool or the local allocator state is
+    out of date, so the allocator is seeded again from what exists in AWS now. Names still taken
+    after that (e.g. a bucket name owned by another account) are skipped.
 
-    return False  # Default to False if the instance isn't found or not CLI-managed
+    Args:
+    - kind (str): Name kind (e.g. "bucket" or "zone"), also the inventory cache type of its listing.
+    - reserve_names (callable): Reserves `count` names of the kind, e.g. `get_next_bucket_names`.
+    - is_taken (callable): Returns True if a resource with the given name exists.
+
+    Returns:
+    - str: The reserved name.
+    """
+    for attempt in range(MAX_NAME_ATTEMPTS):
+        name = reserve_names(1)[0]
+        if not is_taken(name):
+            return name
+
+        if attempt == 0:
+            print(f"The {kind} name '{name}' is already in use, rescanning the existing {kind} names.")
+            inventory_cache.invalidate(kind) # The cached listing missed it, so it's stale too
+            name_allocator.reset(kind)
+
+    raise RuntimeError(f"Could not find a free {kind} name after {MAX_NAME_ATTEMPTS} attempts.")
 
 
 # ============================
 # S3 related functions
 # ============================
 
-def get_next_bucket_name():
+def get_highest_bucket_index():
     """
-    Generates the next S3 bucket name in the format `elad-sopher-bucket-{i+1}`.
+    Finds the highest index used by the existing `elad-sopher-bucket-{i}` buckets.
 
     Returns:
-    - str: The next available bucket name.
+    - int: The highest index in use (0 if there are no such buckets).
     """
-    s3 = boto3.client("s3")
-    response = s3.list_buckets()
+    # Reuse the cached bucket names if they are still fresh
+    bucket_names = inventory_cache.get_listing("bucket")
+    if bucket_names is None:
+        s3 = get_client("s3")
+        bucket_names = [bucket["Name"] for bucket in s3.list_buckets()["Buckets"]]
+        inventory_cache.put_listing("bucket", bucket_names)
 
-    highest_index = 0
     pattern = re.compile(r"elad-sopher-bucket-(\d+)$")  # Regex pattern to extract index number
+    indexes = [int(match.group(1)) for match in map(pattern.match, bucket_names) if match]
 
-    # Iterate through existing buckets to find the highest index
-    for bucket in response["Buckets"]:
-        name = bucket["Name"]
-        match = pattern.match(name)
+    return max(indexes, default=0)
 
-        if match:
-            try:
-                index = int(match.group(1)) # Extract numerical index from bucket name
-                highest_index = max(highest_index, index)
-            except ValueError:
-                continue # Skip if conversion fails (shouldn't happen with correct naming)
+def get_next_bucket_names(count):
+    """
+    Reserves the next `count` S3 bucket names in the format `elad-sopher-bucket-{i}`.
 
-    return f"elad-sopher-bucket-{highest_index + 1}" # Generate the next bucket name
+    Names are handed out by the local name allocator, so concurrent runs never pick the same
+    name and the bucket list is only scanned the first time.
+
+    Args:
+    - count (int): Number of names to reserve.
+
+    Returns:
+    - list: The reserved bucket names.
+    """
+    indexes = name_allocator.reserve_indexes("bucket", count, seed=get_highest_bucket_index)
+    return [f"elad-sopher-bucket-{index}" for index in indexes]
+
+def is_bucket_name_taken(bucket_name):
+    """
+    Checks if a bucket with the given name exists, in this account or any other.
+
+    Args:
+    - bucket_name (str): The name of the S3 bucket.
+
+    Returns:
+    - bool: True unless S3 reports that no such bucket exists.
+    """
+    try:
+        get_client("s3").head_bucket(Bucket=bucket_name)
+    except botocore.exceptions.ClientError as e:
+        return e.response["Error"]["Code"] not in ("404", "NoSuchBucket", "NotFound")
+    return True
+
+def get_next_bucket_name():
+    """
+    Reserves the next free S3 bucket name in the format `elad-sopher-bucket-{i}`.
+
+    Returns:
+    - str: The next available bucket name.
+    """
+    return reserve_free_name("bucket", get_next_bucket_names, is_bucket_name_taken)
 
 def is_cli_managed_bucket(bucket_name: str) -> bool:
     """
@@ -135,17 +273,24 @@ def is_cli_managed_bucket(bucket_name: str) -> bool:
     Returns:
     - bool: True if the bucket is CLI-Managed, False otherwise.
     """
-    s3_client = boto3.client("s3")
+    # Use the cached tags when this bucket was looked up recently
+    cached = inventory_cache.get_resource("bucket", bucket_name)
+    if cached:
+        return cached["tags"].get("Managed") == "CLI Managed"
+
+    s3_client = get_client("s3")
 
     try:
         # Get bucket tags
         response = s3_client.get_bucket_tagging(Bucket=bucket_name)
         tags = {tag["Key"]: tag["Value"] for tag in response.get("TagSet", [])}
+        inventory_cache.put_resource("bucket", bucket_name, tags)
 
         return tags.get("Managed") == "CLI Managed" # Check if 'Managed' tag is set correctly
 
     except s3_client.exceptions.ClientError as e:
         if e.response["Error"]["Code"] == "NoSuchTagSet":
+            inventory_cache.put_resource("bucket", bucket_name, {})
             print(f"Warning: Bucket {bucket_name} has no tags.") # Handle buckets with no tags
         else:
             print(f"Error checking bucket tags: {e}") # Handle other S3 client errors
@@ -153,29 +298,275 @@ def is_cli_managed_bucket(bucket_name: str) -> bool:
     return False # Default to False if bucket isn't CLI-managed
 
 
+DEFAULT_TAG_SCAN_WORKERS = 16 # Concurrent get_bucket_tagging calls used by the tag scanner
+
+# Error codes S3 returns when a bucket lives in a different region than the client
+REDIRECT_ERROR_CODES = {"PermanentRedirect", "AuthorizationHeaderMalformed", "IllegalLocationConstraintException", "301"}
+
+def get_bucket_tags(s3_client, bucket_name, regional_client=None):
+    """
+    Fetches the tags of a single bucket, following a cross-region redirect once.
+
+    Args:
+    - s3_client: S3 client used for the first attempt.
+    - bucket_name (str): The name of the S3 bucket.
+    - regional_client (callable): Returns an S3 client for a given region name. None disables redirects.
+
+    Returns:
+    - dict: The bucket tags ({} if the bucket has no tags).
+    - None: If the bucket no longer exists or its tags couldn't be read.
+    """
+    try:
+        response = s3_client.get_bucket_tagging(Bucket=bucket_name)
+        return {tag["Key"]: tag["Value"] for tag in response.get("TagSet", [])}
+
+    except botocore.exceptions.ClientError as e:
+        code = e.response["Error"]["Code"]
+
+        if code == "NoSuchTagSet":
+            return {} # Bucket exists but has no tags
+        if code == "NoSuchBucket":
+            return None # Bucket was deleted while scanning
+
+        if code in REDIRECT_ERROR_CODES and regional_client:
+            # Retry once against the region the bucket actually lives in
+            headers = e.response.get("ResponseMetadata", {}).get("HTTPHeaders", {})
+            region = headers.get("x-amz-bucket-region") or e.response["Error"].get("Region")
+            if region:
+                return get_bucket_tags(regional_client(region), bucket_name)
+
+        print(f"Error retrieving tags for bucket {bucket_name}: {e}", file=sys.stderr) # Keep stdout clean for --output
+        return None
+
+def scan_bucket_tags(bucket_names, max_workers=DEFAULT_TAG_SCAN_WORKERS, region=None):
+    """
+    Fetches the tags of many buckets concurrently with a bounded thread pool.
+
+    Args:
+    - bucket_names (list): Names of the buckets to scan.
+    - max_workers (int): Maximum number of concurrent tag requests.
+    - region (str): Region the buckets live in, so no request is redirected. None uses the default region.
+
+    Returns:
+    - list: (bucket_name, tags) tuples in the same order as `bucket_names`.
+      `tags` is None for buckets whose tags couldn't be read.
+    """
+    s3_client = get_client("s3", region)
+
+    def regional_client(region):
+        return get_client("s3", region) # Shared per-region client, created once per process
+
+    with ContextThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        # executor.map keeps the results in input order
+        tags = executor.map(lambda name: get_bucket_tags(s3_client, name, regional_client), bucket_names)
+        return list(zip(bucket_names, tags))
+
+def get_cli_managed_buckets(max_workers=DEFAULT_TAG_SCAN_WORKERS):
+    """
+    Lists the names of all buckets tagged "Managed: CLI Managed".
+
+    Args:
+    - max_workers (int): Maximum number of concurrent tag requests.
+
+    Returns:
+    - list: Names of the CLI-managed buckets, in the order returned by `list_buckets`.
+    """
+    s3_client = get_client("s3")
+    bucket_names = [bucket["Name"] for bucket in s3_client.list_buckets().get("Buckets", [])]
+    bucket_tags = scan_bucket_tags(bucket_names, max_workers)
+
+    # Write the fresh results through to the local inventory cache
+    inventory_cache.put_listing("bucket", bucket_names)
+    inventory_cache.put_resources("bucket", [(name, tags, None, None) for name, tags in bucket_tags if tags is not None])
+
+    return [name for name, tags in bucket_tags if tags and tags.get("Managed") == "CLI Managed"]
+
+def get_bucket_region(s3_client, bucket):
+    """
+    Returns the region of a bucket from the `list_buckets` entry, or asks S3 if the entry doesn't include it.
+
+    Args:
+    - s3_client: S3 client.
+    - bucket (dict): Bucket entry as returned by `list_buckets`.
+
+    Returns:
+    - str: The bucket region.
+    """
+    if bucket.get("BucketRegion"):
+        return bucket["BucketRegion"]
+
+    location = s3_client.get_bucket_location(Bucket=bucket["Name"]).get("LocationConstraint")
+    # Buckets in us-east-1 have no location constraint, and old eu-west-1 buckets report "EU"
+    return {None: "us-east-1", "": "us-east-1", "EU": "eu-west-1"}.get(location, location)
+
+def get_cli_managed_buckets_by_region(regions, max_workers=DEFAULT_TAG_SCAN_WORKERS):
+    """
+    Yields the names of the CLI-managed buckets that live in the given regions.
+
+    Buckets are grouped by region and the tags of every region are scanned at the same time,
+    each with a client of that region. Each region is yielded as soon as it and the regions
+    before it are done, and a failed region doesn't stop the others.
+
+    Args:
+    - regions (list): Region names.
+    - max_workers (int): Maximum number of concurrent tag requests per region.
+
+    Yields:
+    - tuple: (region, bucket_names, error) in the order of `regions`. `error` is None on success.
+    """
+    s3_client = get_client("s3")
+    buckets = s3_client.list_buckets().get("Buckets", [])
+
+    with ContextThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        bucket_regions = list(executor.map(lambda bucket: get_bucket_region(s3_client, bucket), buckets))
+
+    names_by_region = {region: [] for region in regions}
+    for bucket, region in zip(buckets, bucket_regions):
+        if region in names_by_region:
+            names_by_region[region].append(bucket["Name"])
+
+    def scan(region):
+        bucket_tags = scan_bucket_tags(names_by_region[region], max_workers, region)
+        inventory_cache.put_resources("bucket", [(name, tags, None, None) for name, tags in bucket_tags if tags is not None])
+        return [name for name, tags in bucket_tags if tags and tags.get("Managed") == "CLI Managed"]
+
+    with ContextThreadPoolExecutor(max_workers=max(1, len(regions))) as executor:
+        scans = [(region, executor.submit(scan, region)) for region in regions]
+        for region, scan_future in scans:
+            try:
+                yield region, scan_future.result(), None
+            except Exception as e:
+                yield region, [], e
+
+
 # ============================
 # Route 53 related functions
 # ============================
 
-def get_next_zone_name():
+ZONE_TAG_BATCH_SIZE = 10 # Maximum number of hosted zones per list_tags_for_resources request
+
+_zone_ids = {} # Hosted zone name -> ID, reused across lookups in this process
+_zone_ids_lock = threading.Lock()
+
+def normalize_zone_name(zone_name):
+    """Returns a zone name in lower case without the trailing dot Route 53 adds."""
+    return zone_name.rstrip(".").lower()
+
+def clear_zone_ids():
+    """Forgets the hosted zone IDs remembered by this process (used by long-lived processes after each command)."""
+    with _zone_ids_lock:
+        _zone_ids.clear()
+
+def iter_hosted_zones():
     """
-    Determines the next available hosted zone name in the format `elad-sopher-zone-{i+1}.com`.
+    Yields every hosted zone in the account, following pagination, and indexes their IDs by name.
+
+    Yields:
+    - dict: Hosted zone as returned by `list_hosted_zones`.
+    """
+    client = get_client("route53")
+    paginator = client.get_paginator("list_hosted_zones") # list_hosted_zones_by_name has no paginator
+
+    for page in paginator.paginate():
+        for zone in page["HostedZones"]:
+            with _zone_ids_lock:
+                _zone_ids.setdefault(normalize_zone_name(zone["Name"]), zone["Id"].split("/")[-1])
+            yield zone
+
+def find_hosted_zone_id(zone_name):
+    """
+    Resolves a hosted zone name to its ID with a single name-indexed lookup.
+
+    `list_hosted_zones_by_name` starts its listing at the requested name, so the zone is
+    either the first result or doesn't exist, no matter how many zones the account has.
+
+    Args:
+    - zone_name (str): The name of the hosted zone.
 
     Returns:
-    - str: The next available hosted zone name.
+    - str: The hosted zone ID.
+    - None: If no hosted zone has that name.
     """
-    client = boto3.client("route53")
-    response = client.list_hosted_zones()
+    name = normalize_zone_name(zone_name)
+
+    with _zone_ids_lock:
+        if name in _zone_ids:
+            return _zone_ids[name]
+
+    client = get_client("route53")
+    response = client.list_hosted_zones_by_name(DNSName=f"{name}.", MaxItems="1")
 
-    # Extract all existing hosted zones that match the naming pattern
-    existing_zones = [
-        zone["Name"].rstrip(".") for zone in response["HostedZones"]
-        if zone["Name"].startswith("elad-sopher-zone-") and zone["Name"].endswith(".com")
-    ]
+    for zone in response["HostedZones"]:
+        if normalize_zone_name(zone["Name"]) == name:
+            zone_id = zone["Id"].split("/")[-1] # Extract the actual zone ID
+            with _zone_ids_lock:
+                _zone_ids[name] = zone_id
+            return zone_id
 
-    # Increment index until a unique name is found
-    index = 1
-    while f"elad-sopher-zone-{index}.com" in existing_zones:
-        index += 1
+    return None
 
-    return f"elad-sopher-zone-{index}.com" # Return the next available zone name
\ No newline at end of file
+def get_cli_managed_zones():
+    """
+    Finds every CLI-managed hosted zone, fetching tags for up to 10 zones per request.
+
+    Returns:
+    - list: Hosted zones (as returned by `list_hosted_zones`) tagged "Managed: CLI Managed".
+    """
+    client = get_client("route53")
+
+    # List all hosted zones (every page)
+    zones = {zone["Id"].split("/")[-1]: zone for zone in iter_hosted_zones()}
+    zone_ids = list(zones)
+    cli_managed_zones = []
+
+    for i in range(0, len(zone_ids), ZONE_TAG_BATCH_SIZE):
+        response = client.list_tags_for_resources(ResourceType="hostedzone", ResourceIds=zone_ids[i:i + ZONE_TAG_BATCH_SIZE])
+
+        for tag_set in response["ResourceTagSets"]:
+            tags = {tag["Key"]: tag["Value"] for tag in tag_set.get("Tags", [])}
+            if tags.get("Managed") == "CLI Managed":
+                cli_managed_zones.append(zones[tag_set["ResourceId"]])
+
+    return cli_managed_zones
+
+def get_highest_zone_index():
+    """
+    Finds the highest index used by the existing `elad-sopher-zone-{i}.com` hosted zones.
+
+    Returns:
+    - int: The highest index in use (0 if there are no such zones).
+    """
+    # Reuse the cached zone names if they are still fresh
+    zone_names = inventory_cache.get_listing("zone")
+    if zone_names is None:
+        zone_names = [normalize_zone_name(zone["Name"]) for zone in iter_hosted_zones()]
+        inventory_cache.put_listing("zone", zone_names)
+
+    pattern = re.compile(r"elad-sopher-zone-(\d+)\.com$")
+    indexes = [int(match.group(1)) for match in map(pattern.match, zone_names) if match]
+
+    return max(indexes, default=0)
+
+def get_next_zone_names(count):
+    """
+    Reserves the next `count` hosted zone names in the format `elad-sopher-zone-{i}.com`.
+
+    Args:
+    - count (int): Number of names to reserve.
+
+    Returns:
+    - list: The reserved hosted zone names.
+    """
+    indexes = name_allocator.reserve_indexes("zone", count, seed=get_highest_zone_index)
+    return [f"elad-sopher-zone-{index}.com" for index in indexes]
+
+def get_next_zone_name():
+    """
+    Reserves the next free hosted zone name in the format `elad-sopher-zone-{i}.com`.
+
+    Route 53 accepts several zones with the same name, so the name is checked before it is used.
+
+    Returns:
+    - str: The next available hosted zone name.
+    """
+    return reserve_free_name("zone", get_next_zone_names, lambda zone_name: find_hosted_zone_id(zone_name) is not None)
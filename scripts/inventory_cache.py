@@ -0,0 +1,234 @@
+import json
+import os
+from contextlib import closing
+import sqlite3
+import time
+
+# Location of the on-disk cache shared by every CLI run
+CACHE_PATH = os.getenv(
+    "CLI_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".aws-resource-management", "inventory.db")
+)
+
+# How long (in seconds) cached entries stay valid, per resource type.
+# Each value can be overridden with an environment variable, e.g. CLI_CACHE_TTL_BUCKET=60.
+DEFAULT_TTLS = {
+    "bucket": 3600,
+    "zone": 3600,
+    "ami": 86400,
+    "instance-type": 30 * 86400,
+}
+
+_enabled = True
+_schema_paths = set() # Cache databases whose tables this process already created
+
+def set_enabled(enabled):
+    """
+    Turns cache reads on or off for this process (used by `--no-cache`).
+
+    Writes still happen while reads are disabled, so fresh lookups refresh the cache.
+
+    Args:
+    - enabled (bool): False forces every lookup to go to AWS.
+    """
+    global _enabled
+    _enabled = enabled
+
+def get_ttl(resource_type):
+    """
+    Returns the TTL in seconds for a resource type.
+
+    Args:
+    - resource_type (str): Resource type (e.g. "bucket", "zone").
+
+    Returns:
+    - float: Number of seconds entries of this type stay valid.
+    """
+    default = DEFAULT_TTLS.get(resource_type, 300)
+    return float(os.getenv(f"CLI_CACHE_TTL_{resource_type.upper()}", default))
+
+def _connect():
+    """Opens the cache database, creating the schema the first time this process opens it."""
+    if CACHE_PATH in _schema_paths:
+        return sqlite3.connect(CACHE_PATH, timeout=10)
+
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    connection = sqlite3.connect(CACHE_PATH, timeout=10)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS resources ("
+        " resource_type TEXT, resource_id TEXT, name TEXT, tags TEXT, state TEXT, updated_at REAL,"
+        " PRIMARY KEY (resource_type, resource_id))"
+    )
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS listings ("
+        " resource_type TEXT PRIMARY KEY, resource_ids TEXT, updated_at REAL)"
+    )
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS lookups ("
+        " lookup_type TEXT, lookup_key TEXT, value TEXT, updated_at REAL,"
+        " PRIMARY KEY (lookup_type, lookup_key))"
+    )
+    _schema_paths.add(CACHE_PATH)
+    return connection
+
+def _run(query, params=(), fetch=False, many=False):
+    """
+    Runs a single statement against the cache.
+
+    Cache failures (e.g. a read-only home directory) are treated as misses, so the CLI keeps working.
+    """
+    try:
+        with closing(_connect()) as connection, connection: # Close the connection and commit on success
+            if many:
+                connection.executemany(query, params)
+                return None
+            cursor = connection.execute(query, params)
+            return cursor.fetchone() if fetch else None
+    except sqlite3.Error:
+        _schema_paths.discard(CACHE_PATH) # E.g. the database was deleted, so create the schema again next time
+        return None
+
+def get_resource(resource_type, resource_id=None, name=None):
+    """
+    Returns a cached resource by ID or by name if it is still fresh.
+
+    Args:
+    - resource_type (str): Resource type (e.g. "bucket", "zone").
+    - resource_id (str): ID of the resource.
+    - name (str): Name of the resource, used when the ID isn't known.
+
+    Returns:
+    - dict: Cached "id", "name", "tags" and "state" of the resource.
+    - None: If the cache is disabled, the entry is missing or it expired.
+    """
+    if not _enabled:
+        return None
+
+    column, value = ("resource_id", resource_id) if resource_id is not None else ("name", name)
+    row = _run(
+        f"SELECT resource_id, name, tags, state, updated_at FROM resources WHERE resource_type = ? AND {column} = ?",
+        (resource_type, value), fetch=True
+    )
+
+    if not row or time.time() - row[4] > get_ttl(resource_type):
+        return None
+
+    return {"id": row[0], "name": row[1], "tags": json.loads(row[2]), "state": row[3]}
+
+def put_resource(resource_type, resource_id, tags, state=None, name=None):
+    """
+    Stores (or refreshes) a resource in the cache.
+
+    Args:
+    - resource_type (str): Resource type (e.g. "bucket", "zone").
+    - resource_id (str): ID of the resource.
+    - tags (dict): Tags of the resource.
+    - state (str): Current state of the resource, if it has one.
+    - name (str): Name of the resource, if it differs from its ID.
+    """
+    _run(
+        "INSERT OR REPLACE INTO resources VALUES (?, ?, ?, ?, ?, ?)",
+        (resource_type, resource_id, name, json.dumps(tags), state, time.time())
+    )
+
+def put_resources(resource_type, resources):
+    """
+    Stores many resources of the same type in a single transaction.
+
+    Args:
+    - resource_type (str): Resource type (e.g. "bucket", "zone").
+    - resources (list): (resource_id, tags, state, name) tuples.
+    """
+    now = time.time()
+    _run(
+        "INSERT OR REPLACE INTO resources VALUES (?, ?, ?, ?, ?, ?)",
+        [(resource_type, resource_id, name, json.dumps(tags), state, now) for resource_id, tags, state, name in resources],
+        many=True
+    )
+
+def get_listing(resource_type):
+    """
+    Returns the cached list of all resource IDs of a type if it is still fresh.
+
+    Args:
+    - resource_type (str): Resource type (e.g. "bucket", "zone").
+
+    Returns:
+    - list: Cached resource IDs.
+    - None: If the cache is disabled, the listing is missing or it expired.
+    """
+    if not _enabled:
+        return None
+
+    row = _run("SELECT resource_ids, updated_at FROM listings WHERE resource_type = ?", (resource_type,), fetch=True)
+    if not row or time.time() - row[1] > get_ttl(resource_type):
+        return None
+
+    return json.loads(row[0])
+
+def put_listing(resource_type, resource_ids):
+    """
+    Stores the full list of resource IDs of a type.
+
+    Args:
+    - resource_type (str): Resource type (e.g. "bucket", "zone").
+    - resource_ids (list): Every resource ID of that type.
+    """
+    _run("INSERT OR REPLACE INTO listings VALUES (?, ?, ?)", (resource_type, json.dumps(list(resource_ids)), time.time()))
+
+def get_lookup(lookup_type, lookup_key, ttl=None):
+    """
+    Returns a cached lookup result (e.g. a resolved AMI ID) if it is still fresh.
+
+    Lookups describe AWS data rather than CLI-managed resources, so `invalidate` never drops them.
+
+    Args:
+    - lookup_type (str): Kind of lookup (e.g. "ami").
+    - lookup_key (str): Key identifying the lookup (e.g. "ubuntu:arm64:us-east-1").
+    - ttl (float): Seconds the result stays valid. None uses the TTL of the lookup type.
+
+    Returns:
+    - str: The cached value.
+    - None: If the cache is disabled, the value is missing or it expired.
+    """
+    if not _enabled:
+        return None
+
+    row = _run(
+        "SELECT value, updated_at FROM lookups WHERE lookup_type = ? AND lookup_key = ?",
+        (lookup_type, lookup_key), fetch=True
+    )
+    ttl = get_ttl(lookup_type) if ttl is None else ttl
+    if not row or time.time() - row[1] > ttl:
+        return None
+
+    return row[0]
+
+def put_lookup(lookup_type, lookup_key, value):
+    """
+    Stores a lookup result.
+
+    Args:
+    - lookup_type (str): Kind of lookup (e.g. "ami").
+    - lookup_key (str): Key identifying the lookup.
+    - value (str): The result to cache.
+    """
+    _run("INSERT OR REPLACE INTO lookups VALUES (?, ?, ?, ?)", (lookup_type, lookup_key, value, time.time()))
+
+def invalidate(resource_type=None, resource_id=None):
+    """
+    Drops cached entries after a command changed resources in AWS.
+
+    Args:
+    - resource_type (str): Resource type to drop. None drops the whole cache.
+    - resource_id (str): Single resource to drop. None drops every resource of the type and its listing.
+    """
+    if resource_type is None:
+        _run("DELETE FROM resources")
+        _run("DELETE FROM listings")
+    elif resource_id is None:
+        _run("DELETE FROM resources WHERE resource_type = ?", (resource_type,))
+        _run("DELETE FROM listings WHERE resource_type = ?", (resource_type,))
+    else:
+        _run("DELETE FROM resources WHERE resource_type = ? AND resource_id = ?", (resource_type, resource_id))
+        _run("DELETE FROM listings WHERE resource_type = ?", (resource_type,))
@@ -0,0 +1,118 @@
+import itertools
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_JOB_WORKERS = 4 # Jobs running at the same time
+
+class ThreadRoutedStream:
+    """
+    File-like stream that splits everything written to it into lines and tags each line
+    with the job running on the writing thread.
+
+    Lines are put on an event queue instead of being written anywhere, so a UI thread can
+    drain them safely. Threads that don't run a job (e.g. pools started inside a job) are
+    tagged with None.
+    """
+
+    def __init__(self, events, local):
+        self.events = events
+        self.local = local
+        self.buffers = {} # Unfinished line per thread
+        self.lock = threading.Lock()
+
+    def write(self, text):
+        job = getattr(self.local, "job", None)
+        thread_id = threading.get_ident()
+
+        with self.lock:
+            *lines, rest = (self.buffers.pop(thread_id, "") + text).split("\n")
+            if rest:
+                self.buffers[thread_id] = rest
+
+        for line in lines:
+            self.events.put(("output", job, line))
+        return len(text)
+
+    def flush(self):
+        with self.lock:
+            rest = self.buffers.pop(threading.get_ident(), None)
+        if rest:
+            self.events.put(("output", getattr(self.local, "job", None), rest))
+
+    def isatty(self):
+        return False
+
+class JobRunner:
+    """
+    Persistent pool that runs script functions in-process, several at a time.
+
+    Every job emits ("queued" | "started" | "finished" | "failed" | "output", job, payload) events
+    on `events`, which the caller drains from its own thread (see `drain`).
+    """
+
+    def __init__(self, max_workers=DEFAULT_JOB_WORKERS):
+        self.events = queue.Queue()
+        self.local = threading.local()
+        self.stream = ThreadRoutedStream(self.events, self.local)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="job")
+        self.ids = itertools.count(1)
+
+    def capture_output(self):
+        """Routes `print` output of every thread in this process through the event queue."""
+        sys.stdout = self.stream
+        sys.stderr = self.stream
+
+    def submit(self, name, func, *args, **kwargs):
+        """
+        Queues a job.
+
+        Args:
+        - name (str): Label of the job in the events (e.g. "list-instances").
+        - func (callable): Function to run on a worker thread.
+        - *args, **kwargs: Arguments passed to `func`.
+
+        Returns:
+        - str: The job label, unique within this runner (e.g. "#3 list-instances").
+        """
+        job = f"#{next(self.ids)} {name}"
+        self.events.put(("queued", job, None))
+        self.executor.submit(self.run, job, func, args, kwargs)
+        return job
+
+    def run(self, job, func, args, kwargs):
+        self.local.job = job
+        self.events.put(("started", job, None))
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.stream.flush()
+            self.events.put(("failed", job, e))
+        else:
+            self.stream.flush()
+            self.events.put(("finished", job, result))
+        finally:
+            self.local.job = None
+
+    def drain(self, limit=500):
+        """
+        Returns the pending events without blocking.
+
+        Args:
+        - limit (int): Maximum number of events returned, so a chatty job can't stall the caller.
+
+        Returns:
+        - list: (kind, job, payload) tuples in the order they were emitted.
+        """
+        events = []
+        while len(events) < limit:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def shutdown(self):
+        """Stops accepting jobs. Running jobs finish in the background."""
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,97 @@
+import json
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+# Local state file holding the next free index per name kind, shared by every CLI run on this machine
+STATE_PATH = os.getenv(
+    "CLI_NAME_STATE_PATH",
+    os.path.join(os.path.expanduser("~"), ".aws-resource-management", "names.json")
+)
+
+@contextmanager
+def _locked(path):
+    """
+    Holds an exclusive lock on `path + ".lock"` for the duration of the block.
+
+    The lock is released by the OS if the process dies, so a crashed run never blocks the next one.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".lock", "a+b") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _read_state():
+    try:
+        with open(STATE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {} # Missing or corrupted state, every kind is seeded again
+
+def _write_state(state):
+    # Write to a temporary file first so a crash never leaves a half-written state behind
+    temp_path = STATE_PATH + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(temp_path, STATE_PATH)
+
+def reserve_indexes(kind, count=1, seed=None):
+    """
+    Atomically reserves the next `count` indexes of a name kind.
+
+    Concurrent runs on the same machine (e.g. two Jenkins builds on one agent) serialize on a
+    lock file, so each index is handed out exactly once. The first reservation of a kind calls
+    `seed` to find the highest index already in use; later reservations never touch AWS, until
+    `reset` drops the kind (e.g. when a reserved name turns out to exist already).
+    Indexes of reservations that end up unused (e.g. a canceled creation) are simply skipped.
+
+    Args:
+    - kind (str): Name kind (e.g. "bucket" or "zone").
+    - count (int): Number of indexes to reserve.
+    - seed (callable): Returns the highest index in use. Called only when the kind has no state yet.
+
+    Returns:
+    - list: The reserved indexes, in increasing order.
+    """
+    with _locked(STATE_PATH):
+        state = _read_state()
+
+        if kind not in state:
+            state[kind] = (seed() if seed else 0) + 1
+
+        first = state[kind]
+        state[kind] = first + count
+        _write_state(state)
+
+    return list(range(first, first + count))
+
+def reset(kind=None):
+    """
+    Forgets the next index of a kind (or of every kind), so the next reservation seeds it again.
+
+    Args:
+    - kind (str): Name kind to reset. None resets every kind.
+    """
+    with _locked(STATE_PATH):
+        state = _read_state()
+        if kind is None:
+            state = {}
+        else:
+            state.pop(kind, None)
+        _write_state(state)
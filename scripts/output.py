@@ -0,0 +1,128 @@
+import csv
+import io
+import json
+import sys
+import time
+
+FORMATS = ["table", "json", "ndjson", "csv"]
+
+BUFFER_SIZE = 64 * 1024 # Buffered output is written once it reaches this size...
+BUFFER_SECONDS = 0.5 # ...or once it is this old, so rows still show up while a scan is running
+
+class RecordWriter:
+    """
+    Streams records to stdout in one output format through a single buffer.
+
+    Records are written as they arrive and never collected, so memory stays flat no matter
+    how many resources are listed. Errors become structured records:
+    - table: an "Error: ..." line, like the rest of the CLI.
+    - json: collected in an "errors" array next to "items" (the document is
+      {"items": [...], "errors": [...], "exit_code": 0|1}).
+    - ndjson: a line with an "error" key, between the item lines.
+    - csv: an NDJSON line on stderr, so the CSV stays parseable.
+
+    Args:
+    - output_format (str): One of FORMATS.
+    - fields (list): (key, table column width) pairs, in column order.
+    - empty_message (str): Printed in table format if no record was written.
+    """
+
+    def __init__(self, output_format, fields, empty_message=None, stream=None):
+        self.format = output_format
+        self.fields = fields
+        self.keys = [key for key, _ in fields]
+        self.empty_message = empty_message
+        self.stream = stream or sys.stdout
+        self.buffer = io.StringIO()
+        self.buffered_at = None
+        self.count = 0
+        self.errors = []
+
+        if self.format == "csv":
+            self.csv_writer = csv.DictWriter(self.buffer, fieldnames=self.keys, extrasaction="ignore", lineterminator="\n")
+            self.csv_writer.writeheader()
+        elif self.format == "json":
+            self.buffer.write('{"items": [')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_value is not None and isinstance(exc_value, Exception):
+            self.error(str(exc_value)) # Record unexpected failures instead of leaving half a document
+            self.close()
+            return True
+        self.close()
+        return False
+
+    def format_row(self, values):
+        return "  ".join(str(value)[:width].ljust(width) for value, (_, width) in zip(values, self.fields)).rstrip()
+
+    def write(self, record):
+        """Writes one record (a dict with the keys of `fields`)."""
+        if self.format == "table":
+            if not self.count:
+                self.buffer.write(self.format_row([key.upper() for key in self.keys]) + "\n")
+            self.buffer.write(self.format_row(["-" if record.get(key) is None else record.get(key) for key in self.keys]) + "\n")
+        elif self.format == "json":
+            self.buffer.write(("" if not self.count else ",") + "\n  " + json.dumps(record))
+        elif self.format == "ndjson":
+            self.buffer.write(json.dumps(record) + "\n")
+        else:
+            self.csv_writer.writerow({key: "" if record.get(key) is None else record.get(key) for key in self.keys})
+
+        self.count += 1
+        self.maybe_flush()
+
+    def error(self, message, **context):
+        """
+        Records an error, e.g. a region that couldn't be scanned.
+
+        Args:
+        - message (str): What went wrong.
+        - **context: Extra fields identifying what failed (e.g. region="eu-west-1").
+        """
+        record = {"error": message, **context}
+        self.errors.append(record)
+
+        if self.format == "table":
+            where = "".join(f" in {value}" for value in context.values())
+            self.buffer.write(f"Error{where}: {message}\n")
+        elif self.format == "ndjson":
+            self.buffer.write(json.dumps(record) + "\n")
+        elif self.format == "csv":
+            self.flush()
+            print(json.dumps(record), file=sys.stderr)
+        self.maybe_flush()
+
+    def maybe_flush(self):
+        now = time.monotonic()
+        if self.buffered_at is None:
+            self.buffered_at = now
+        if self.buffer.tell() >= BUFFER_SIZE or now - self.buffered_at >= BUFFER_SECONDS:
+            self.flush()
+
+    def flush(self):
+        """Writes everything buffered so far."""
+        data = self.buffer.getvalue()
+        if data:
+            self.stream.write(data)
+            self.stream.flush()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        self.buffered_at = None
+
+    def close(self):
+        """Finishes the document and flushes it."""
+        if self.format == "json":
+            errors = ",".join("\n    " + json.dumps(error) for error in self.errors)
+            self.buffer.write(("\n" if self.count else "") + '], "errors": [' + errors + ("\n" if errors else "") +
+                              f'], "exit_code": {self.exit_code}}}\n')
+        elif self.format == "table" and not self.count and not self.errors and self.empty_message:
+            self.buffer.write(self.empty_message + "\n")
+        self.flush()
+
+    @property
+    def exit_code(self):
+        """1 if any error was recorded, 0 otherwise."""
+        return 1 if self.errors else 0
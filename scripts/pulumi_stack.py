@@ -0,0 +1,117 @@
+import threading
+import pulumi.automation as auto
+from scripts.regions import HOME_REGION
+
+PROJECT_NAME = "AWS-Resource-Management"
+
+_lock = threading.Lock()
+_workspace = None
+_stacks = {}
+_ready_plugins = set() # (name, version) pairs verified in this process
+_stack_regions = {} # Stack name -> region already configured in this process
+
+def get_ec2_stack_name(region):
+    """
+    Returns the name of the EC2 stack of a region.
+
+    The home region keeps the original "devec2" stack so existing deployments are still found.
+
+    Args:
+    - region (str): AWS region name.
+
+    Returns:
+    - str: The stack name (e.g. "devec2" or "devec2-eu-west-1").
+    """
+    return "devec2" if region == HOME_REGION else f"devec2-{region}"
+
+def get_workspace():
+    """
+    Returns the Pulumi workspace shared by every stack in this process, creating it on first use.
+
+    Returns:
+    - auto.LocalWorkspace: The shared workspace.
+    """
+    global _workspace
+
+    with _lock:
+        if _workspace is None:
+            _workspace = auto.LocalWorkspace(
+                project_settings=auto.ProjectSettings(name=PROJECT_NAME, runtime="python")
+            )
+        return _workspace
+
+def ensure_plugin(workspace, name, version):
+    """
+    Installs a resource plugin only if a matching major version isn't installed yet.
+
+    Args:
+    - workspace (auto.LocalWorkspace): Workspace used to list and install plugins.
+    - name (str): Plugin name (e.g. "aws").
+    - version (str): Required version (e.g. "v5" for any 5.x release).
+    """
+    wanted = version.lstrip("v")
+
+    for plugin in workspace.list_plugins():
+        installed = (plugin.version or "").lstrip("v")
+        if plugin.name == name and (installed == wanted or installed.startswith(wanted + ".")):
+            return # Already installed, skip the slow install call
+
+    print(f"Installing the {name} {version} plugin...")
+    workspace.install_plugin(name, version)
+
+def prepare_stack(stack_name, region=None, plugins=()):
+    """
+    Selects (or creates) a stack in the shared workspace and makes sure it is ready to deploy.
+
+    Plugins and config are only touched when they are missing or different. Prepared stacks, and
+    the plugins and regions already checked, are remembered for the rest of the process, so a
+    long-lived process (e.g. the daemon) doesn't start a pulumi process for them on every deploy.
+
+    Args:
+    - stack_name (str): Name of the Pulumi stack (e.g. "devec2").
+    - region (str): AWS region to configure on the stack. None leaves the region config alone.
+    - plugins (tuple): (name, version) pairs of resource plugins the stack needs.
+
+    Returns:
+    - auto.Stack: The prepared stack.
+    """
+    workspace = get_workspace()
+
+    with _lock:
+        stack = _stacks.get(stack_name)
+        if stack is None:
+            stack = auto.Stack.create_or_select(stack_name, workspace)
+            _stacks[stack_name] = stack
+
+    # Listing plugins and reading config each start a pulumi process, so each check runs once per process
+    for name, version in plugins:
+        if (name, version) not in _ready_plugins:
+            ensure_plugin(workspace, name, version)
+            with _lock:
+                _ready_plugins.add((name, version))
+
+    if region and _stack_regions.get(stack_name) != region:
+        # Only write the config when it actually changes
+        current = stack.get_all_config().get("aws:region")
+        if current is None or current.value != region:
+            print("Setting AWS region...")
+            stack.set_config("aws:region", auto.ConfigValue(region))
+        with _lock:
+            _stack_regions[stack_name] = region
+
+    return stack
+
+def deploy_stack(stack, program, parallel=None, refresh=False):
+    """
+    Runs `pulumi up` for an inline program on a prepared stack.
+
+    Args:
+    - stack (auto.Stack): Stack returned by `prepare_stack`.
+    - program (callable): Inline Pulumi program to deploy.
+    - parallel (int): Maximum number of resource operations Pulumi runs at once. None uses Pulumi's default.
+    - refresh (bool): Refresh the stack state from AWS before updating.
+
+    Returns:
+    - auto.UpResult: The result of the update.
+    """
+    return stack.up(program=program, parallel=parallel, refresh=refresh, on_output=print)
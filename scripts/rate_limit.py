@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+
+# Default sustained request rate (requests per second) and burst allowed per service and region.
+# Route 53 allows about 5 requests per second per account. EC2 refills its bucket of
+# describe calls at 20 per second, with bursts of up to 100.
+DEFAULT_LIMITS = {
+    "route53": (5.0, 5.0),
+    "ec2": (20.0, 100.0),
+    "s3": (1000.0, 1000.0),
+    "ssm": (40.0, 40.0),
+}
+DEFAULT_LIMIT = (50.0, 50.0) # Services without a known limit
+
+# Error codes AWS services use to report throttling
+THROTTLE_ERROR_CODES = {
+    "Throttling", "ThrottlingException", "ThrottledException", "RequestThrottledException", "RequestThrottled",
+    "TooManyRequestsException", "ProvisionedThroughputExceededException", "RequestLimitExceeded",
+    "BandwidthLimitExceeded", "LimitExceededException", "SlowDown", "EC2ThrottledException",
+    "PriorRequestNotComplete",
+}
+
+GLOBAL_SERVICES = {"route53"} # Limited per account, whichever region the client uses
+
+MIN_RATE = 0.5 # The rate never drops below this, however often requests are throttled
+DECREASE_FACTOR = 0.5 # A throttled response halves the rate...
+DECREASE_COOLDOWN = 1.0 # ...at most once per second, since concurrent requests are throttled together
+INCREASE_STEP = 1.0 # Successful responses raise the rate by about this much per second, up to the limit
+
+class RateLimiter:
+    """
+    Thread-safe token bucket: allows `rate` requests per second on average, with bursts of up to `burst`.
+
+    The rate adapts to throttling (additive increase, multiplicative decrease): every throttled
+    response halves it and every successful one raises it slightly, back up to the configured limit.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.max_rate = rate
+        self.rate = rate
+        self.max_burst = burst or max(1.0, rate)
+        self.burst = self.max_burst
+        self.tokens = self.burst
+        self.updated_at = time.monotonic()
+        self.throttled_at = None
+        self.throttles = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a request is allowed."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait) # Sleep outside the lock so other threads can refill their view
+
+    def set_rate(self, rate):
+        # The burst shrinks with the rate, so an idle period doesn't allow a burst the service just rejected
+        self.rate = rate
+        self.burst = max(1.0, self.max_burst * rate / self.max_rate)
+        self.tokens = min(self.tokens, self.burst)
+
+    def on_success(self):
+        """Raises the rate after a successful response (additive increase)."""
+        with self.lock:
+            if self.rate < self.max_rate:
+                # Adding step / rate per response adds about `step` per second at full rate
+                self.set_rate(min(self.max_rate, self.rate + INCREASE_STEP / self.rate))
+
+    def on_throttle(self):
+        """Lowers the rate after a throttled response (multiplicative decrease)."""
+        with self.lock:
+            self.throttles += 1
+            now = time.monotonic()
+            if self.throttled_at is not None and now - self.throttled_at < DECREASE_COOLDOWN:
+                return # Part of the same burst of throttled requests
+            self.throttled_at = now
+            self.set_rate(max(MIN_RATE, self.rate * DECREASE_FACTOR))
+            self.tokens = 0.0 # Stop the requests already queued from going out at the old rate
+
+    def register(self, events):
+        """
+        Hooks the limiter into a client's event system, so every request (and retry) waits for a token.
+
+        Args:
+        - events (botocore.hooks.HierarchicalEmitter): The client's `meta.events`.
+        """
+        events.register("before-send", self.before_send)
+        events.register("needs-retry", self.needs_retry)
+
+    def before_send(self, **kwargs):
+        self.acquire() # Returns None, so botocore still sends the request itself
+
+    def needs_retry(self, response=None, **kwargs):
+        if not response:
+            return # Connection errors say nothing about the request rate
+        http_response, parsed = response
+        code = (parsed or {}).get("Error", {}).get("Code")
+        status_code = getattr(http_response, "status_code", None)
+
+        if code in THROTTLE_ERROR_CODES or status_code == 429:
+            self.on_throttle()
+        elif status_code is not None and status_code < 400:
+            self.on_success()
+        # Returns None, so botocore's retry handler still decides whether to retry
+
+_limiters = {}
+_lock = threading.Lock()
+
+def get_rate_limiter(service, region=None):
+    """
+    Returns the process-wide rate limiter of a service in a region.
+
+    Every client of the service and region shares it, so the limit holds across threads, async tasks
+    and (in the daemon) commands. The rate can be overridden with environment variables,
+    e.g. AWS_RATE_LIMIT_ROUTE53=3 and AWS_RATE_LIMIT_BURST_EC2=50.
+
+    Args:
+    - service (str): AWS service name (e.g. "route53").
+    - region (str): AWS region name (service limits apply per account and region).
+
+    Returns:
+    - RateLimiter: The shared limiter.
+    """
+    key = (service, None if service in GLOBAL_SERVICES else region)
+
+    with _lock:
+        if key not in _limiters:
+            default_rate, default_burst = DEFAULT_LIMITS.get(service, DEFAULT_LIMIT)
+            name = service.upper().replace("-", "_")
+            rate = float(os.getenv(f"AWS_RATE_LIMIT_{name}", default_rate))
+            # An overridden rate keeps the service's burst-to-rate ratio unless the burst is overridden too
+            burst = float(os.getenv(f"AWS_RATE_LIMIT_BURST_{name}", max(1.0, rate * default_burst / default_rate)))
+            _limiters[key] = RateLimiter(rate, burst)
+        return _limiters[key]
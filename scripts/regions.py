@@ -0,0 +1,52 @@
+from scripts.aws_clients import get_client, get_session
+from scripts.executors import ContextThreadPoolExecutor
+
+HOME_REGION = "us-east-1" # Region used when neither the CLI nor the AWS config name one
+
+def get_default_region():
+    """Returns the region of the AWS config/environment, or the home region if none is set."""
+    return get_session().region_name or HOME_REGION
+
+def resolve_regions(regions=None):
+    """
+    Expands the `--regions` values into a list of region names.
+
+    Args:
+    - regions (list): Region names, comma-separated lists of them, or "all". None means the default region.
+
+    Returns:
+    - list: Region names without duplicates, in the requested order ("all" is sorted by name).
+    """
+    names = [name.strip() for value in regions or [] for name in value.split(",") if name.strip()]
+
+    if not names:
+        return [get_default_region()]
+
+    if "all" in names:
+        # Every region enabled for the account
+        response = get_client("ec2", get_default_region()).describe_regions(
+            Filters=[{"Name": "opt-in-status", "Values": ["opt-in-not-required", "opted-in"]}]
+        )
+        return sorted(region["RegionName"] for region in response["Regions"])
+
+    return list(dict.fromkeys(names))
+
+def run_per_region(func, regions):
+    """
+    Runs `func(region)` for every region at the same time, one worker per region.
+
+    Args:
+    - func (callable): Called with a region name. Should use a client of that region.
+    - regions (list): Region names.
+
+    Returns:
+    - list: (region, result, error) tuples in the order of `regions`. `error` is None on success.
+    """
+    def run(region):
+        try:
+            return region, func(region), None
+        except Exception as e:
+            return region, None, e
+
+    with ContextThreadPoolExecutor(max_workers=max(1, len(regions))) as executor:
+        return list(executor.map(run, regions)) # executor.map keeps the results in region order
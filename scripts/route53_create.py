@@ -1,19 +1,20 @@
 import pulumi
 import pulumi_aws as aws
-from pulumi.automation import create_or_select_stack
 from scripts.helpers import get_next_zone_name
+from scripts import inventory_cache
+from scripts.pulumi_stack import prepare_stack, deploy_stack
 
-def pulumi_program():
+def pulumi_program(zone_name):
     """
     Pulumi program to create a Route 53 hosted zone.
 
     This function:
-    - Retrieves the next available hosted zone name using `get_next_zone_name()`.
     - Creates a Route 53 hosted zone with the "CLI Managed" tag.
     - Exports the zone name for later reference.
-    """
 
-    zone_name = get_next_zone_name() # Generate the next unique hosted zone name
+    Args:
+    - zone_name (str): Name reserved with `get_next_zone_name()`.
+    """
 
     # Create a new Route 53 hosted zone
     hosted_zone = aws.route53.Zone(
@@ -24,29 +25,35 @@ def pulumi_program():
 
     pulumi.export("zone_name", hosted_zone.name) # Export the zone name for Pulumi output
 
-def create_hosted_zone():
+def create_hosted_zone(parallel=None, refresh=False):
     """
     Manages the Pulumi stack and creates a Route 53 hosted zone.
 
     This function:
+    - Reserves the next available hosted zone name using `get_next_zone_name()`.
     - Selects or creates the Pulumi stack.
     - Runs `pulumi up` to deploy the hosted zone.
     - Displays the output of the operation.
+
+    Args:
+    - parallel (int): Maximum number of resource operations Pulumi runs at once.
+    - refresh (bool): Refresh the stack state from AWS before deploying.
     """
 
-    project_name = "AWS-Resource-Management" # Define the Pulumi project name
-    stack_name = "dev53" # Define the stack name
+    zone_name = get_next_zone_name() # Reserve the next unique hosted zone name
 
     # Select or create the Pulumi stack for managing Route 53
-    stack = create_or_select_stack(stack_name=stack_name, project_name=project_name, program=pulumi_program)
+    stack = prepare_stack("dev53")
 
     print("Running Pulumi to create the Hosted Zone...")
     try:
         # Execute Pulumi deployment
-        up_res = stack.up(on_output=print)
+        up_res = deploy_stack(stack, lambda: pulumi_program(zone_name), parallel, refresh)
 
         # Print deployment summary and the created hosted zone name
         print("Pulumi output:", up_res.summary)
         print(f"Hosted Zone '{up_res.outputs['zone_name'].value}' was created.")
     except Exception as e:
-        print("Error creating hosted zone:", e) # Handle errors during deployment
\ No newline at end of file
+        print("Error creating hosted zone:", e) # Handle errors during deployment
+    finally:
+        inventory_cache.invalidate("zone") # The new zone makes the cached zone names stale
\ No newline at end of file
@@ -1,4 +1,11 @@
-import boto3
+import csv
+import json
+import os
+import time
+from scripts.aws_clients import get_client
+from scripts.executors import ContextThreadPoolExecutor
+from scripts import inventory_cache
+from scripts.helpers import find_hosted_zone_id, normalize_zone_name
 
 def get_cli_managed_zone(zone_name):
     """
@@ -12,26 +19,31 @@ def get_cli_managed_zone(zone_name):
     - None: If the zone is not found or not CLI-managed.
     """
 
-    client = boto3.client("route53")
-    response = client.list_hosted_zones()
+    # Use the cached zone when it was looked up recently
+    cached = inventory_cache.get_resource("zone", name=normalize_zone_name(zone_name))
+    if cached:
+        if cached["tags"].get("Managed") == "CLI Managed":
+            return cached["id"]
+        print(f"Zone '{zone_name}' is not managed by the CLI.")
+        return None
 
-    # Iterate through all hosted zones to find the matching name
-    for zone in response["HostedZones"]:
-        if zone["Name"].rstrip(".") == zone_name: # Strip trailing dot from Route 53 zone names
-            zone_id = zone["Id"].split("/")[-1] # Extract the actual zone ID
+    # Resolve the zone ID by name instead of scanning every hosted zone
+    zone_id = find_hosted_zone_id(zone_name)
+    if not zone_id:
+        print(f"Zone '{zone_name}' not found.")
+        return None
 
-            # Fetch tags for the hosted zone
-            tag_response = client.list_tags_for_resource(ResourceType="hostedzone", ResourceId=zone_id)
-            tags = {tag["Key"]: tag["Value"] for tag in tag_response["ResourceTagSet"]["Tags"]}
+    # Fetch tags for the hosted zone
+    client = get_client("route53")
+    tag_response = client.list_tags_for_resource(ResourceType="hostedzone", ResourceId=zone_id)
+    tags = {tag["Key"]: tag["Value"] for tag in tag_response["ResourceTagSet"]["Tags"]}
+    inventory_cache.put_resource("zone", zone_id, tags, name=normalize_zone_name(zone_name))
 
-            # Check if the zone has the "Managed: CLI Managed" tag
-            if tags.get("Managed") == "CLI Managed":
-                return zone_id
-            else:
-                print(f"Zone '{zone_name}' is not managed by the CLI.")
-                return None
+    # Check if the zone has the "Managed: CLI Managed" tag
+    if tags.get("Managed") == "CLI Managed":
+        return zone_id
 
-    print(f"Zone '{zone_name}' not found.")
+    print(f"Zone '{zone_name}' is not managed by the CLI.")
     return None
 
 def manage_dns_record(zone_name, record_name, record_type, record_value, action):
@@ -50,7 +62,7 @@ def manage_dns_record(zone_name, record_name, record_type, record_value, action)
     - None
     """
 
-    client = boto3.client("route53")
+    client = get_client("route53")
     zone_id = get_cli_managed_zone(zone_name) # Get the hosted zone ID if it is CLI-managed
 
     if not zone_id:
@@ -101,3 +113,179 @@ def manage_dns_record(zone_name, record_name, record_type, record_value, action)
 
     except Exception as e:
         print(f"Error managing DNS record: {e}") # Handle errors gracefully
+
+
+# Route 53 limits per change_resource_record_sets request
+MAX_BATCH_RECORDS = 1000 # ResourceRecord elements (UPSERT counts twice)
+MAX_BATCH_CHARACTERS = 32000 # Characters across all record values (UPSERT counts twice)
+
+def load_records(file_path):
+    """
+    Reads DNS records from a CSV, JSON or YAML file.
+
+    Every record has "name", "type", "value" and optionally "ttl" (default 300) and "action"
+    (CREATE, UPDATE or DELETE, default CREATE). In JSON and YAML, "value" may be a list of values.
+
+    Args:
+    - file_path (str): Path to a .csv, .json, .yaml or .yml file.
+
+    Returns:
+    - list: The records as dicts.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+
+    with open(file_path, newline="") as f:
+        if extension == ".csv":
+            return list(csv.DictReader(f))
+        if extension == ".json":
+            return json.load(f)
+        if extension in [".yaml", ".yml"]:
+            import yaml # Optional dependency, only needed for YAML record files
+            return yaml.safe_load(f)
+
+    raise ValueError(f"Unsupported record file format '{extension}' (use .csv, .json, .yaml or .yml).")
+
+def build_changes(records):
+    """
+    Turns records into Route 53 changes, merging rows with the same name, type and action into one record set.
+
+    Args:
+    - records (list): Records as returned by `load_records`.
+
+    Returns:
+    - list: Change dicts for `change_resource_record_sets`.
+
+    Raises:
+    - ValueError: If an action is invalid, or rows merged into one record set have different TTLs.
+    """
+    record_sets = {}
+
+    for record in records:
+        action = str(record.get("action") or "CREATE").upper()
+        if action not in ["CREATE", "UPDATE", "DELETE"]:
+            raise ValueError(f"Invalid action '{action}' for record {record.get('name')}.")
+
+        # Use UPSERT to handle both CREATE and UPDATE actions
+        route53_action = "DELETE" if action == "DELETE" else "UPSERT"
+        key = (route53_action, record["name"], record["type"].upper())
+        values = record["value"] if isinstance(record["value"], list) else [record["value"]]
+        ttl = int(record.get("ttl") or 300)
+
+        if key not in record_sets:
+            record_sets[key] = {
+                "Name": record["name"],
+                "Type": record["type"].upper(),
+                "TTL": ttl,
+                "ResourceRecords": [],
+            }
+        elif record_sets[key]["TTL"] != ttl:
+            # A record set has a single TTL, so don't silently pick one of them
+            raise ValueError(f"Conflicting TTLs for {record['name']} ({key[2]}): {record_sets[key]['TTL']} and {ttl}.")
+        record_sets[key]["ResourceRecords"].extend({"Value": str(value)} for value in values)
+
+    return [{"Action": action, "ResourceRecordSet": record_set} for (action, _, _), record_set in record_sets.items()]
+
+def pack_change_batches(changes):
+    """
+    Packs changes into the fewest change batches allowed by the Route 53 request limits.
+
+    Args:
+    - changes (list): Change dicts for `change_resource_record_sets`.
+
+    Returns:
+    - list: Lists of changes, each small enough for a single request.
+    """
+    batches = []
+    batch, records, characters = [], 0, 0
+
+    for change in changes:
+        values = change["ResourceRecordSet"].get("ResourceRecords", [])
+        weight = 2 if change["Action"] == "UPSERT" else 1
+        change_records = max(len(values), 1) * weight # Alias records have no values but still count
+        change_characters = sum(len(value["Value"]) for value in values) * weight
+
+        # Start a new batch when this change would exceed either limit
+        if batch and (records + change_records > MAX_BATCH_RECORDS or characters + change_characters > MAX_BATCH_CHARACTERS):
+            batches.append(batch)
+            batch, records, characters = [], 0, 0
+
+        batch.append(change)
+        records += change_records
+        characters += change_characters
+
+    if batch:
+        batches.append(batch)
+
+    return batches
+
+def wait_for_changes(change_ids, max_workers=8):
+    """
+    Waits concurrently until every change reaches the INSYNC status.
+
+    Args:
+    - change_ids (list): IDs returned in the ChangeInfo of each submitted batch.
+    - max_workers (int): Number of changes polled at the same time.
+
+    Returns:
+    - dict: Seconds each change took to become INSYNC, per change ID.
+    """
+    client = get_client("route53")
+    start = time.perf_counter()
+
+    def wait(change_id):
+        client.get_waiter("resource_record_sets_changed").wait(Id=change_id)
+        return time.perf_counter() - start
+
+    with ContextThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        return dict(zip(change_ids, executor.map(wait, change_ids)))
+
+def manage_dns_records_bulk(zone_name, file_path, wait=False):
+    """
+    Applies DNS record changes from a CSV, JSON or YAML file to a CLI-managed hosted zone.
+
+    Records are packed into as few change batches as the Route 53 limits allow, so thousands
+    of records take a handful of API calls instead of one call per record.
+
+    Args:
+    - zone_name (str): The name of the hosted zone where the records are managed.
+    - file_path (str): Path to the record file (see `load_records` for the format).
+    - wait (bool): Wait until every change batch is INSYNC before returning.
+
+    Returns:
+    - list: Error message of every batch that couldn't be submitted (empty if all were).
+    """
+
+    client = get_client("route53")
+    zone_id = get_cli_managed_zone(zone_name) # Get the hosted zone ID if it is CLI-managed
+
+    if not zone_id:
+        raise ValueError("Cannot modify records in a non-CLI-managed zone.") # Prevent modifications in unmanaged zones
+
+    changes = build_changes(load_records(file_path))
+    batches = pack_change_batches(changes)
+    print(f"Submitting {len(changes)} record changes in {len(batches)} batches...")
+
+    change_ids = []
+    failures = []
+    for index, batch in enumerate(batches, start=1):
+        start = time.perf_counter()
+        try:
+            response = client.change_resource_record_sets(HostedZoneId=zone_id, ChangeBatch={"Changes": batch})
+        except Exception as e:
+            failures.append(f"Batch {index}/{len(batches)} failed: {e}")
+            print(failures[-1]) # Keep submitting the remaining batches
+            continue
+
+        change_ids.append(response["ChangeInfo"]["Id"])
+        print(f"Batch {index}/{len(batches)}: {len(batch)} changes submitted in "
+              f"{(time.perf_counter() - start) * 1000:.0f} ms ({response['ChangeInfo']['Status']}).")
+
+    if wait and change_ids:
+        print("Waiting for all changes to be INSYNC...")
+        for change_id, seconds in wait_for_changes(change_ids).items():
+            print(f"Change {change_id} INSYNC after {seconds:.1f}s.")
+
+    if failures:
+        print(f"{len(failures)} of {len(batches)} batches failed.")
+
+    return failures
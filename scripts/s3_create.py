@@ -3,25 +3,30 @@ import pulumi
 import pulumi_aws as aws
 from pulumi_aws import s3
 from pulumi import ResourceOptions
-import pulumi.automation as auto
 from scripts.helpers import get_next_bucket_name
-import time  # For unique stack naming
+from scripts import inventory_cache
+from scripts.pulumi_stack import prepare_stack, deploy_stack
 
-def create_bucket(access_type: str):
+def create_bucket(access_type: str, parallel: int = None, refresh: bool = False, skip_confirmation: bool = None):
     """
     Creates an S3 bucket with either private or public access.
 
     Args:
     - access_type (str): "private" for a private bucket, "public" for a publicly accessible bucket.
+    - parallel (int): Maximum number of resource operations Pulumi runs at once.
+    - refresh (bool): Refresh the stack state from AWS before deploying.
+    - skip_confirmation (bool): Don't ask before creating a public bucket (e.g. the caller already asked).
+      None reads SKIP_CONFIRMATION from the environment.
     """
 
     bucket_name = get_next_bucket_name() # Generate a unique bucket name following the CLI convention
 
     # Check if we're running in Jenkins or a non-interactive environment
-    skip_confirmation_jenkins = os.getenv("SKIP_CONFIRMATION", "false").lower() == "true"
+    if skip_confirmation is None:
+        skip_confirmation = os.getenv("SKIP_CONFIRMATION", "false").lower() == "true"
 
     # Ask for confirmation before creating a public bucket
-    if access_type == "public" and not skip_confirmation_jenkins:
+    if access_type == "public" and not skip_confirmation:
         confirm = input(f"Bucket {bucket_name} will be public. Are you sure? (yes/no): ").strip().lower()
         if confirm != "yes":
             print("Bucket creation canceled.")
@@ -78,19 +83,14 @@ def create_bucket(access_type: str):
         pulumi.export("bucket_name", bucket.id) # Export bucket name for reference
 
     # Create or select the Pulumi stack for managing the infrastructure
-    stack_name = "devs3"
-    project_name = "AWS-Resource-Management"
-
-    stack = auto.create_or_select_stack(
-        stack_name=stack_name,
-        project_name=project_name,
-        program=pulumi_program,
-    )
+    stack = prepare_stack("devs3")
 
     print("Running Pulumi to create the S3 Bucket...")
     try:
-        up_res = stack.up(on_output=print) # Execute Pulumi to deploy resources
+        up_res = deploy_stack(stack, pulumi_program, parallel, refresh) # Execute Pulumi to deploy resources
         print("Pulumi output:", up_res.summary)
         print(f"S3 Bucket '{bucket_name}' was created.") # Success message with the bucket name
     except Exception as e:
         print("Error creating bucket:", e) # Handle any errors during execution
+    finally:
+        inventory_cache.invalidate("bucket") # The new bucket makes the cached bucket names stale
@@ -1,60 +1,49 @@
-import boto3
-import botocore.exceptions
+from scripts.helpers import get_cli_managed_buckets, get_cli_managed_buckets_by_region, DEFAULT_TAG_SCAN_WORKERS
+from scripts.output import RecordWriter
+from scripts.regions import resolve_regions
 
+# Record fields and their table column widths
+BUCKET_FIELDS = [
+    ("name", 63),
+    ("region", 14),
+]
 
-def list_buckets():
+
+def list_buckets(max_workers=DEFAULT_TAG_SCAN_WORKERS, regions=None, output_format="table"):
     """
     Lists all S3 buckets in the AWS account and filters those tagged as "CLI Managed".
 
     This function checks the tags of each bucket and identifies which ones are managed
-    by the CLI based on the tag "Managed: CLI Managed". It then prints out the names
-    of the CLI managed buckets.
+    by the CLI based on the tag "Managed: CLI Managed". It then writes out the names
+    of the CLI managed buckets. Tags are fetched concurrently by a bounded thread pool.
 
     Args:
-    - None
+    - max_workers (int): Maximum number of concurrent tag requests.
+    - regions (list): Only list buckets in these regions, grouped per region ("all" for every region).
+      None lists the buckets of every region together, without their region.
+    - output_format (str): "table", "json", "ndjson" or "csv".
 
     Returns:
-    - None
+    - list: Error records (empty if the buckets were listed).
     """
 
-    s3_client = boto3.client("s3") # Create an S3 client using boto3
-
-    try:
-        # Get all S3 buckets in the account
-        response = s3_client.list_buckets()
-        all_buckets = response.get("Buckets", []) # Retrieve the list of buckets
-
-        cli_managed_buckets = [] # List to store CLI managed buckets
-
-        # Iterate through each bucket
-        for bucket in all_buckets:
-            bucket_name = bucket["Name"] # Extract the bucket name
-
-            try:
-                # Get the tags for the current bucket
-                tagging = s3_client.get_bucket_tagging(Bucket=bucket_name)
-                tags = {tag["Key"]: tag["Value"] for tag in tagging.get("TagSet", [])} # Create a dictionary of tags
-
-                # Check if the "Managed" tag is set to "CLI Managed"
-                if tags.get("Managed") == "CLI Managed":
-                    cli_managed_buckets.append(bucket_name) # Add the bucket to the list of CLI managed buckets
-
-            except botocore.exceptions.ClientError as e:
-                # Handle error if bucket does not have tags or if there's another issue
-                if e.response["Error"]["Code"] == "NoSuchTagSet":
-                    continue # Skip the bucket if it has no tags
-                else:
-                    print(f"Error retrieving tags for bucket {bucket_name}: {e}") # Print error message if tags retrieval fails
-
-        # If any CLI managed buckets were found, print them
-        if cli_managed_buckets:
-            print("CLI Managed Buckets:")
-            for bucket in cli_managed_buckets:
-                print(f" - {bucket}") # Print each CLI managed bucket name
-
-        else:
-            print("No CLI Managed buckets found.") # Print message if no CLI managed buckets were found
-
-    except Exception as e:
-        # Catch any other unexpected errors and print the error message
-        print("Error listing buckets:", e)
\ No newline at end of file
+    with RecordWriter(output_format, BUCKET_FIELDS, "No CLI Managed buckets found.") as writer:
+        try:
+            if regions:
+                # Scan every requested region at the same time and write them in order
+                for region, names, error in get_cli_managed_buckets_by_region(resolve_regions(regions), max_workers):
+                    if error:
+                        writer.error(f"Could not list buckets: {error}", region=region) # Record the failed region
+                    for name in names:
+                        writer.write({"name": name, "region": region})
+                    writer.flush()
+            else:
+                # Get all CLI managed buckets in the account
+                for name in get_cli_managed_buckets(max_workers):
+                    writer.write({"name": name, "region": None})
+
+        except Exception as e:
+            # Record any unexpected error as a structured error
+            writer.error(f"Could not list buckets: {e}")
+
+    return writer.errors
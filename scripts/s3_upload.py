@@ -1,36 +1,293 @@
-import boto3
+import glob
+import hashlib
+import json
 import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from boto3.s3.transfer import TransferConfig
+from scripts.aws_clients import get_client
+from scripts.executors import ContextThreadPoolExecutor
 from scripts.helpers import is_cli_managed_bucket
 
-def upload_files_to_bucket(bucket_name: str, file_path: str):
+MB = 1024 * 1024
+
+DEFAULT_UPLOAD_WORKERS = 8 # Files uploaded at the same time
+DEFAULT_PART_SIZE_MB = 16 # Size of each multipart upload part
+DEFAULT_PART_CONCURRENCY = 4 # Parts of a single file uploaded at the same time
+DEFAULT_MULTIPART_THRESHOLD_MB = 64 # Files larger than this are uploaded in parts
+
+MANIFEST_NAME = ".cli-sync-manifest.json" # Object storing the content hash of every synced key
+HASH_CACHE_PATH = os.getenv(
+    "CLI_HASH_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".aws-resource-management", "hash-cache.json")
+)
+
+def collect_upload_files(paths, prefix=""):
+    """
+    Expands files, directories and glob patterns into the files to upload.
+
+    Files keep their base name as the object key. Files found inside a directory keep
+    their path relative to that directory, so the tree structure is preserved in the bucket.
+
+    Args:
+    - paths (list): Files, directories or glob patterns (e.g. "build/**/*.zip").
+    - prefix (str): Key prefix added in front of every object key.
+
+    Returns:
+    - list: (local_path, object_key) tuples.
+    - list: Paths that didn't match any file.
     """
-    Uploads a file to an S3 bucket, but only if the bucket was created via the CLI.
+    files = []
+    missing = []
+
+    def add_directory(directory):
+        for root, _, names in os.walk(directory):
+            for name in sorted(names):
+                local_path = os.path.join(root, name)
+                relative_path = os.path.relpath(local_path, directory).replace(os.sep, "/")
+                files.append((local_path, prefix + relative_path))
+
+    for path in paths:
+        # Treat the argument as a glob pattern only if it isn't an existing path
+        matches = [path] if os.path.exists(path) else sorted(glob.glob(path, recursive=True))
+        if not matches:
+            missing.append(path)
+
+        for match in matches:
+            if os.path.isdir(match):
+                add_directory(match)
+            else:
+                files.append((match, prefix + os.path.basename(match)))
+
+    return files, missing
+
+def hash_file(local_path):
+    """
+    Computes the MD5 hex digest of a file, reading it in 8 MB chunks.
+
+    Args:
+    - local_path (str): Path of the file to hash.
+
+    Returns:
+    - str: The MD5 hex digest (matches the ETag of single-part uploads).
+    """
+    digest = hashlib.md5()
+    with open(local_path, "rb") as f:
+        for chunk in iter(lambda: f.read(8 * MB), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_files(local_paths, hash_workers=None):
+    """
+    Hashes files in a process pool, reusing cached hashes of files whose mtime and size didn't change.
+
+    Forking a process copies the locks other threads hold, so when other threads are running
+    (in the daemon or the GUI job runner) the files are hashed in a thread pool instead.
+
+    Args:
+    - local_paths (list): Paths of the files to hash.
+    - hash_workers (int): Number of hashing processes or threads. None uses one per CPU.
+
+    Returns:
+    - dict: MD5 hex digest per local path.
+    """
+    try:
+        with open(HASH_CACHE_PATH) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {} # Missing or corrupted cache, hash everything again
+
+    hashes = {}
+    to_hash = []
+
+    for local_path in local_paths:
+        stat = os.stat(local_path)
+        entry = cache.get(os.path.abspath(local_path))
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            hashes[local_path] = entry[2] # Unchanged since the last sync
+        else:
+            to_hash.append((local_path, stat))
+
+    if to_hash:
+        # hashlib releases the GIL on large reads, so threads still hash several files at a time
+        pool = ProcessPoolExecutor if threading.active_count() == 1 else ContextThreadPoolExecutor
+        with pool(max_workers=hash_workers or os.cpu_count()) as executor:
+            digests = executor.map(hash_file, [local_path for local_path, _ in to_hash], chunksize=16)
+            for (local_path, stat), digest in zip(to_hash, digests):
+                hashes[local_path] = digest
+                cache[os.path.abspath(local_path)] = [stat.st_mtime_ns, stat.st_size, digest]
+
+        # Write a temporary file first, so concurrent jobs and crashes never leave a truncated cache.
+        # Each writer gets its own temporary file; the last one to finish wins.
+        os.makedirs(os.path.dirname(HASH_CACHE_PATH), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(HASH_CACHE_PATH), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(cache, f)
+            os.replace(temp_path, HASH_CACHE_PATH)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path) # Only left behind if the write failed
+
+    print(f"Hashed {len(to_hash)} files ({len(local_paths) - len(to_hash)} reused from the local cache).")
+    return hashes
+
+def plan_sync(s3_client, bucket_name, files, prefix, hash_workers=None):
+    """
+    Works out which files changed compared to what is already in the bucket.
+
+    A file is unchanged when the remote object exists and either its ETag or the hash
+    stored in the sync manifest matches the local content (multipart ETags aren't MD5s,
+    so the manifest covers them).
+
+    Args:
+    - s3_client: S3 client.
+    - bucket_name (str): Name of the S3 bucket.
+    - files (list): (local_path, object_key) tuples.
+    - prefix (str): Key prefix the files are synced under.
+    - hash_workers (int): Number of hashing processes.
+
+    Returns:
+    - list: (local_path, object_key) tuples that need to be uploaded.
+    - dict: Content hash of every local file per object key (the new manifest).
+    - list: Remote keys under the prefix that no longer exist locally.
+    """
+    manifest_key = prefix + MANIFEST_NAME
+
+    try:
+        response = s3_client.get_object(Bucket=bucket_name, Key=manifest_key)
+        remote_manifest = json.loads(response["Body"].read())
+    except s3_client.exceptions.NoSuchKey:
+        remote_manifest = {} # First sync under this prefix
+
+    # ETag of every remote object under the prefix
+    remote_etags = {}
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            remote_etags[obj["Key"]] = obj["ETag"].strip('"')
+
+    local_hashes = hash_files([local_path for local_path, _ in files], hash_workers)
+    manifest = {key: local_hashes[local_path] for local_path, key in files}
+
+    changed = [
+        (local_path, key) for local_path, key in files
+        if key not in remote_etags or manifest[key] not in (remote_etags[key], remote_manifest.get(key))
+    ]
+    removed = [key for key in remote_etags if key not in manifest and key != manifest_key]
+
+    return changed, manifest, removed
+
+def delete_keys(s3_client, bucket_name, keys):
+    """
+    Deletes objects in batches of 1,000 keys.
+
+    Args:
+    - s3_client: S3 client.
+    - bucket_name (str): Name of the S3 bucket.
+    - keys (list): Keys of the objects to delete.
+    """
+    for i in range(0, len(keys), 1000):
+        batch = [{"Key": key} for key in keys[i:i + 1000]]
+        response = s3_client.delete_objects(Bucket=bucket_name, Delete={"Objects": batch, "Quiet": True})
+        for error in response.get("Errors", []):
+            print(f"Error deleting {error['Key']}: {error.get('Code')} {error.get('Message', '')}")
+
+    print(f"Deleted {len(keys)} objects that were removed locally.")
+
+def upload_files_to_bucket(bucket_name: str, file_paths, prefix: str = "", workers: int = DEFAULT_UPLOAD_WORKERS,
+                           part_size_mb: int = DEFAULT_PART_SIZE_MB, part_concurrency: int = DEFAULT_PART_CONCURRENCY,
+                           multipart_threshold_mb: int = DEFAULT_MULTIPART_THRESHOLD_MB, sync: bool = False,
+                           delete: bool = False, hash_workers: int = None):
+    """
+    Uploads files, directories or glob matches to an S3 bucket, but only if the bucket was created via the CLI.
+
+    Several files are uploaded at once, and large files are split into parts uploaded in parallel.
+    In sync mode, only new or changed files are uploaded, based on a content-hash manifest stored in the bucket.
 
     Args:
     - bucket_name (str): Name of the S3 bucket.
-    - file_path (str): Path to the file to be uploaded.
+    - file_paths (str | list): File, directory or glob pattern to upload, or a list of them.
+    - prefix (str): Key prefix added in front of every object key.
+    - workers (int): Number of files uploaded at the same time.
+    - part_size_mb (int): Size of each multipart upload part in MB.
+    - part_concurrency (int): Number of parts of a single file uploaded at the same time.
+    - multipart_threshold_mb (int): Files larger than this (in MB) use multipart uploads.
+    - sync (bool): Only upload files whose content differs from the bucket.
+    - delete (bool): In sync mode, also delete remote objects under the prefix that no longer exist locally.
+    - hash_workers (int): Number of processes hashing files in sync mode. None uses one per CPU.
 
     Returns:
     - None
     """
 
-    # Check if the file exists before proceeding
-    if not os.path.exists(file_path):
-        print(f"Error: File '{file_path}' does not exist.")
+    if isinstance(file_paths, str):
+        file_paths = [file_paths]
+
+    # Check that every path exists before proceeding
+    files, missing = collect_upload_files(file_paths, prefix)
+    if missing:
+        for path in missing:
+            print(f"Error: File '{path}' does not exist.")
         return
 
-    # Validate if the bucket is CLI-managed before uploading
+    if not files:
+        print("Error: No files to upload.")
+        return
+
+    # Validate once that the bucket is CLI-managed before uploading any file
     if not is_cli_managed_bucket(bucket_name):
         print(f"Error: Cannot upload. {bucket_name} is not a CLI-Managed bucket.")
         return
 
-    # Initialize the S3 client
-    s3_client = boto3.client("s3")
+    # Initialize the S3 client and the multipart transfer settings
+    s3_client = get_client("s3")
+    transfer_config = TransferConfig(
+        multipart_threshold=multipart_threshold_mb * MB,
+        multipart_chunksize=part_size_mb * MB,
+        max_concurrency=part_concurrency,
+        use_threads=part_concurrency > 1,
+    )
 
-    try:
-        # Upload the file to the specified S3 bucket
-        s3_client.upload_file(file_path, bucket_name, os.path.basename(file_path))
-        print(f"File '{file_path}' uploaded successfully to {bucket_name}.")
+    if sync:
+        files_to_upload, manifest, removed = plan_sync(s3_client, bucket_name, files, prefix, hash_workers)
+        print(f"{len(files_to_upload)} of {len(files)} files are new or changed.")
+    else:
+        files_to_upload = files
+
+    def upload(local_path, key):
+        s3_client.upload_file(local_path, bucket_name, key, Config=transfer_config)
+        return os.path.getsize(local_path)
+
+    start = time.perf_counter()
+    total_bytes = 0
+    failed = 0
+
+    with ContextThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(upload, local_path, key): (local_path, key) for local_path, key in files_to_upload}
+
+        for future in as_completed(futures):
+            local_path, key = futures[future]
+            try:
+                total_bytes += future.result()
+                print(f"File '{local_path}' uploaded successfully to {bucket_name}/{key}.")
+            except Exception as e:
+                failed += 1
+                if sync:
+                    manifest.pop(key, None) # Don't record content that never made it to the bucket
+                print(f"Error uploading file '{local_path}': {e}") # Handle upload errors
+
+    # Print the aggregate throughput of the whole upload
+    elapsed = time.perf_counter() - start
+    throughput = total_bytes / MB / elapsed if elapsed > 0 else 0
+    print(f"Uploaded {len(files_to_upload) - failed}/{len(files_to_upload)} files ({total_bytes / MB:.1f} MB) "
+          f"in {elapsed:.1f}s ({throughput:.1f} MB/s).")
+
+    if sync:
+        # Store the new manifest so the next sync can skip unchanged multipart uploads
+        s3_client.put_object(Bucket=bucket_name, Key=prefix + MANIFEST_NAME, Body=json.dumps(manifest).encode())
 
-    except Exception as e:
-        print(f"Error uploading file: {e}") # Handle upload errors
+        if delete and removed:
+            delete_keys(s3_client, bucket_name, removed)
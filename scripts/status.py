@@ -0,0 +1,139 @@
+import asyncio
+import time
+from scripts.aws_clients import get_client
+from scripts.executors import ContextThreadPoolExecutor
+from scripts.helpers import iter_cli_managed_instances, get_bucket_tags, get_cli_managed_zones
+
+DEFAULT_STATUS_CONCURRENCY = 32 # AWS calls in flight at once across every service
+
+class StatusEngine:
+    """
+    Runs blocking boto3 calls on a thread pool from asyncio, with one concurrency limit shared by every service.
+    """
+
+    def __init__(self, concurrency=DEFAULT_STATUS_CONCURRENCY):
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.executor = ContextThreadPoolExecutor(max_workers=max(1, concurrency))
+
+    async def call(self, func, *args):
+        """Runs `func(*args)` on the pool once a global concurrency slot is free."""
+        async with self.semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+async def collect_instances(engine):
+    """
+    Lists every CLI-managed EC2 instance.
+
+    Returns:
+    - list: Report lines, one per instance.
+    """
+    states = ["pending", "running", "stopping", "stopped"] # Terminated instances are gone for good
+    instances = await engine.call(lambda: list(iter_cli_managed_instances(states=states)))
+
+    lines = []
+    for instance in instances:
+        name = next((tag["Value"] for tag in instance.get("Tags", []) if tag["Key"] == "Name"), "N/A")
+        lines.append(f"{instance['InstanceId']}  {name}  {instance['InstanceType']}  {instance['State']['Name']}  "
+                     f"{instance.get('PublicIpAddress', 'N/A')}")
+    return lines
+
+async def collect_buckets(engine):
+    """
+    Lists every CLI-managed S3 bucket, fetching the tags of all buckets concurrently.
+
+    Returns:
+    - list: Report lines, one per bucket.
+    """
+    s3_client = get_client("s3")
+    response = await engine.call(s3_client.list_buckets)
+    bucket_names = [bucket["Name"] for bucket in response.get("Buckets", [])]
+
+    def regional_client(region):
+        return get_client("s3", region)
+
+    tags = await asyncio.gather(*(
+        engine.call(get_bucket_tags, s3_client, name, regional_client) for name in bucket_names
+    ))
+
+    return [name for name, bucket_tags in zip(bucket_names, tags)
+            if bucket_tags and bucket_tags.get("Managed") == "CLI Managed"]
+
+async def collect_zones(engine):
+    """
+    Lists every CLI-managed hosted zone, fetching tags for up to 10 zones per request.
+
+    The tag batches run one after another: Route 53's rate limit makes parallel batches no faster.
+
+    Returns:
+    - list: Report lines, one per hosted zone.
+    """
+    zones = await engine.call(get_cli_managed_zones)
+
+    return [f"{zone['Name'].rstrip('.')}  {zone['Id'].split('/')[-1]}  {zone.get('ResourceRecordSetCount', 0)} records"
+            for zone in zones]
+
+# Report sections: title and collector
+SECTIONS = [
+    ("EC2 Instances", collect_instances),
+    ("S3 Buckets", collect_buckets),
+    ("Route 53 Hosted Zones", collect_zones),
+]
+
+async def gather_status(concurrency=DEFAULT_STATUS_CONCURRENCY):
+    """
+    Queries every service concurrently and prints each section as soon as it is complete.
+
+    Args:
+    - concurrency (int): Maximum number of AWS calls in flight at once.
+
+    Returns:
+    - list: Titles of the sections that failed.
+    """
+    engine = StatusEngine(concurrency)
+    start = time.perf_counter()
+    failures = []
+
+    async def run_section(title, collector):
+        try:
+            return title, await collector(engine), None
+        except Exception as e:
+            return title, None, e
+
+    try:
+        for section in asyncio.as_completed([run_section(title, collector) for title, collector in SECTIONS]):
+            title, lines, error = await section
+            elapsed = time.perf_counter() - start
+
+            print(f"\n{title} ({elapsed:.1f}s)")
+            print("-" * 40)
+            if error:
+                failures.append(title)
+                print(f"Error: {error}")
+            elif lines:
+                for line in lines:
+                    print(f" - {line}")
+            else:
+                print(" (none)")
+    finally:
+        engine.close()
+
+    print(f"\nStatus collected in {time.perf_counter() - start:.1f}s.")
+    return failures
+
+def show_status(concurrency=DEFAULT_STATUS_CONCURRENCY):
+    """
+    Prints every CLI-managed EC2 instance, S3 bucket and hosted zone in one combined report.
+
+    EC2, S3 and Route 53 (including the per-resource tag lookups) are queried at the same
+    time under a single concurrency limit, instead of one listing command after another.
+
+    Args:
+    - concurrency (int): Maximum number of AWS calls in flight at once.
+
+    Returns:
+    - list: Titles of the sections that failed.
+    """
+    return asyncio.run(gather_status(concurrency))
@@ -0,0 +1,86 @@
+import time
+from concurrent.futures import wait, FIRST_COMPLETED
+from scripts.executors import ContextThreadPoolExecutor
+
+def run_task_graph(tasks, max_workers=3):
+    """
+    Runs a graph of tasks, executing independent branches concurrently.
+
+    A task starts as soon as all of its dependencies succeeded. If a dependency fails
+    or is skipped, the task is skipped instead of run. Tasks can also run after other tasks
+    whatever their outcome, for cleanup that has to happen in order but regardless of failures.
+    Exceptions never stop the other branches; they are collected in the returned summary.
+
+    Args:
+    - tasks (dict): Maps each task name to a (function, [dependency names]) tuple, or to a
+      (function, [dependency names], [names of tasks it runs after, whatever their outcome]) tuple.
+    - max_workers (int): Maximum number of tasks running at the same time.
+
+    Returns:
+    - list: One dict per task with "name", "status" ("succeeded", "failed" or "skipped"),
+      "duration" (seconds) and "error", in the order the tasks were defined.
+    """
+    # Tasks without a third element don't wait for any task outcome
+    tasks = {name: (spec[0], spec[1], spec[2] if len(spec) > 2 else []) for name, spec in tasks.items()}
+
+    for name, (_, depends_on, runs_after) in tasks.items():
+        for dependency in depends_on + runs_after:
+            if dependency not in tasks:
+                raise ValueError(f"Task '{name}' depends on unknown task '{dependency}'.")
+
+    results = {}
+    pending = dict(tasks)
+    running = {}
+
+    def execute(name, func):
+        start = time.perf_counter()
+        try:
+            func()
+            return {"name": name, "status": "succeeded", "duration": time.perf_counter() - start, "error": None}
+        except Exception as e:
+            return {"name": name, "status": "failed", "duration": time.perf_counter() - start, "error": str(e)}
+
+    with ContextThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        while pending or running:
+            # Skip tasks whose dependencies didn't succeed, and start tasks whose dependencies all did.
+            # Repeat until nothing changes, since a skip can cascade to tasks declared before it.
+            changed = True
+            while changed:
+                changed = False
+                for name, (func, depends_on, runs_after) in list(pending.items()):
+                    statuses = [results[dep]["status"] for dep in depends_on if dep in results]
+
+                    if any(status != "succeeded" for status in statuses):
+                        results[name] = {"name": name, "status": "skipped", "duration": 0.0,
+                                         "error": "a dependency did not succeed"}
+                        del pending[name]
+                        changed = True
+                    elif len(statuses) == len(depends_on) and all(task in results for task in runs_after):
+                        running[executor.submit(execute, name, func)] = name
+                        del pending[name]
+
+            if not running:
+                if pending:
+                    raise ValueError(f"Dependency cycle between tasks: {', '.join(pending)}")
+                break
+
+            # Wait for at least one task to finish before scheduling more
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+
+    return [results[name] for name in tasks]
+
+def print_task_summary(results):
+    """
+    Prints the status and timing of every task in a task graph run.
+
+    Args:
+    - results (list): Summary returned by `run_task_graph`.
+    """
+    print("\nTask summary:")
+    for result in results:
+        line = f" - {result['name']:<20} {result['status']:<10} {result['duration']:>8.2f}s"
+        if result["error"]:
+            line += f"  ({result['error']})"
+        print(line)
@@ -0,0 +1,83 @@
+import json
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+from scripts import helpers, inventory_cache, name_allocator
+
+
+def zone(index):
+    return {
+        "Id": f"/hostedzone/Z{index}",
+        "Name": f"elad-sopher-zone-{index}.com.",
+        "CallerReference": str(index),
+    }
+
+def page(zones, next_marker=None):
+    response = {"HostedZones": zones, "Marker": "", "IsTruncated": next_marker is not None, "MaxItems": "100"}
+    if next_marker:
+        response["NextMarker"] = next_marker
+    return response
+
+@pytest.fixture(autouse=True)
+def local_state(tmp_path, monkeypatch):
+    monkeypatch.setattr(name_allocator, "STATE_PATH", str(tmp_path / "names.json"))
+    monkeypatch.setattr(inventory_cache, "CACHE_PATH", str(tmp_path / "inventory.db"))
+    helpers.clear_zone_ids()
+    yield tmp_path
+    helpers.clear_zone_ids()
+
+@pytest.fixture
+def stubs(monkeypatch):
+    clients = {
+        service: boto3.client(service, region_name="us-east-1", aws_access_key_id="testing", aws_secret_access_key="testing")
+        for service in ("route53", "s3")
+    }
+    monkeypatch.setattr(helpers, "get_client", lambda service, region=None: clients[service])
+
+    stubbers = {service: Stubber(client) for service, client in clients.items()}
+    for stubber in stubbers.values():
+        stubber.activate()
+    yield stubbers
+    for stubber in stubbers.values():
+        stubber.assert_no_pending_responses()
+        stubber.deactivate()
+
+def page_by_name(zones):
+    return {"HostedZones": zones, "IsTruncated": False, "MaxItems": "1"}
+
+def write_state(local_state, state):
+    (local_state / "names.json").write_text(json.dumps(state))
+
+
+def test_iter_hosted_zones_follows_every_page(stubs):
+    stubs["route53"].add_response("list_hosted_zones", page([zone(1), zone(2)], next_marker="Z3"), {})
+    stubs["route53"].add_response("list_hosted_zones", page([zone(3)]), {"Marker": "Z3"})
+
+    zones = list(helpers.iter_hosted_zones())
+
+    assert [zone["Id"] for zone in zones] == ["/hostedzone/Z1", "/hostedzone/Z2", "/hostedzone/Z3"]
+    assert helpers.find_hosted_zone_id("elad-sopher-zone-3.com") == "Z3" # Indexed while listing, no extra call
+
+def test_taken_zone_name_rescans_the_existing_zones(stubs, local_state):
+    write_state(local_state, {"zone": 3}) # Zones 3 and 4 were created by another tool since
+    stubs["route53"].add_response("list_hosted_zones_by_name", page_by_name([zone(3)]),
+                                  {"DNSName": "elad-sopher-zone-3.com.", "MaxItems": "1"})
+    stubs["route53"].add_response("list_hosted_zones", page([zone(1), zone(2), zone(3), zone(4)]), {})
+    stubs["route53"].add_response("list_hosted_zones_by_name", page_by_name([]),
+                                  {"DNSName": "elad-sopher-zone-5.com.", "MaxItems": "1"})
+
+    assert helpers.get_next_zone_name() == "elad-sopher-zone-5.com"
+    assert helpers.get_next_zone_names(1) == ["elad-sopher-zone-6.com"] # The allocator continues from the rescan
+
+def test_bucket_name_owned_elsewhere_is_skipped(stubs, local_state):
+    write_state(local_state, {"bucket": 2})
+    stubs["s3"].add_response("head_bucket", {}, {"Bucket": "elad-sopher-bucket-2"})
+    stubs["s3"].add_response("list_buckets", {"Buckets": [{"Name": "elad-sopher-bucket-2"}]}, {})
+    stubs["s3"].add_client_error("head_bucket", service_error_code="403", http_status_code=403,
+                                 expected_params={"Bucket": "elad-sopher-bucket-3"}) # Another account's bucket
+    stubs["s3"].add_client_error("head_bucket", service_error_code="404", http_status_code=404,
+                                 expected_params={"Bucket": "elad-sopher-bucket-4"})
+
+    assert helpers.get_next_bucket_name() == "elad-sopher-bucket-4"
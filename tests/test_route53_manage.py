@@ -0,0 +1,55 @@
+import json
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+from scripts import route53_manage
+from scripts.route53_manage import build_changes
+
+
+def test_rows_of_one_record_set_are_merged():
+    changes = build_changes([
+        {"name": "www.example.com", "type": "a", "value": "10.0.0.1", "ttl": "60"},
+        {"name": "www.example.com", "type": "A", "value": "10.0.0.2", "ttl": 60},
+        {"name": "www.example.com", "type": "A", "value": "10.0.0.1", "action": "delete"},
+    ])
+
+    assert changes == [
+        {"Action": "UPSERT", "ResourceRecordSet": {
+            "Name": "www.example.com", "Type": "A", "TTL": 60,
+            "ResourceRecords": [{"Value": "10.0.0.1"}, {"Value": "10.0.0.2"}],
+        }},
+        {"Action": "DELETE", "ResourceRecordSet": {
+            "Name": "www.example.com", "Type": "A", "TTL": 300,
+            "ResourceRecords": [{"Value": "10.0.0.1"}],
+        }},
+    ]
+
+def test_conflicting_ttls_are_rejected():
+    with pytest.raises(ValueError, match="Conflicting TTLs for www.example.com"):
+        build_changes([
+            {"name": "www.example.com", "type": "A", "value": "10.0.0.1", "ttl": 60},
+            {"name": "www.example.com", "type": "A", "value": "10.0.0.2"},
+        ])
+
+def test_failed_batches_are_returned(tmp_path, monkeypatch):
+    client = boto3.client("route53", region_name="us-east-1", aws_access_key_id="testing", aws_secret_access_key="testing")
+    monkeypatch.setattr(route53_manage, "get_client", lambda service, region=None: client)
+    monkeypatch.setattr(route53_manage, "get_cli_managed_zone", lambda zone_name: "Z1")
+    monkeypatch.setattr(route53_manage, "MAX_BATCH_RECORDS", 1) # One batch per record
+    records = tmp_path / "records.json"
+    records.write_text(json.dumps([
+        {"name": "a.example.com", "type": "A", "value": "10.0.0.1", "action": "DELETE"},
+        {"name": "b.example.com", "type": "A", "value": "10.0.0.2", "action": "DELETE"},
+    ]))
+
+    with Stubber(client) as stubber:
+        stubber.add_client_error("change_resource_record_sets", service_error_code="InvalidChangeBatch")
+        stubber.add_response("change_resource_record_sets",
+                             {"ChangeInfo": {"Id": "C2", "Status": "PENDING", "SubmittedAt": "2026-01-01T00:00:00Z"}})
+
+        failures = route53_manage.manage_dns_records_bulk("example.com", str(records))
+
+    assert len(failures) == 1
+    assert failures[0].startswith("Batch 1/2 failed:")
@@ -0,0 +1,90 @@
+import pytest
+
+from scripts.task_graph import run_task_graph
+
+
+def succeed():
+    pass
+
+def fail():
+    raise RuntimeError("boom")
+
+def statuses(results):
+    return {result["name"]: result["status"] for result in results}
+
+
+def test_runs_every_task_after_its_dependencies():
+    order = []
+    tasks = {
+        "c": (lambda: order.append("c"), ["b"]),
+        "b": (lambda: order.append("b"), ["a"]),
+        "a": (lambda: order.append("a"), []),
+    }
+
+    results = run_task_graph(tasks)
+
+    assert order == ["a", "b", "c"]
+    assert statuses(results) == {"a": "succeeded", "b": "succeeded", "c": "succeeded"}
+    assert [result["name"] for result in results] == ["c", "b", "a"] # Definition order
+
+def test_failure_skips_dependents_declared_before_their_dependency():
+    tasks = {
+        "c": (succeed, ["b"]),
+        "b": (succeed, ["a"]),
+        "a": (fail, []),
+    }
+
+    results = statuses(run_task_graph(tasks))
+
+    assert results == {"c": "skipped", "b": "skipped", "a": "failed"}
+
+def test_failure_does_not_stop_independent_branches():
+    tasks = {
+        "a": (fail, []),
+        "b": (succeed, ["a"]),
+        "independent": (succeed, []),
+    }
+
+    results = statuses(run_task_graph(tasks))
+
+    assert results == {"a": "failed", "b": "skipped", "independent": "succeeded"}
+
+def test_runs_after_tasks_whatever_their_outcome():
+    order = []
+
+    def fail_after_recording():
+        order.append("a")
+        fail()
+
+    tasks = {
+        "cleanup": (lambda: order.append("cleanup"), [], ["a"]),
+        "a": (fail_after_recording, []),
+        "b": (succeed, ["a"]),
+    }
+
+    results = statuses(run_task_graph(tasks))
+
+    assert order == ["a", "cleanup"]
+    assert results == {"cleanup": "succeeded", "a": "failed", "b": "skipped"}
+
+def test_failure_is_reported_with_its_error():
+    results = run_task_graph({"a": (fail, [])})
+
+    assert results[0]["status"] == "failed"
+    assert results[0]["error"] == "boom"
+
+def test_cycle_raises():
+    tasks = {
+        "a": (succeed, ["b"]),
+        "b": (succeed, ["a"]),
+    }
+
+    with pytest.raises(ValueError, match="Dependency cycle"):
+        run_task_graph(tasks)
+
+def test_unknown_dependency_raises():
+    with pytest.raises(ValueError, match="unknown task"):
+        run_task_graph({"a": (succeed, ["missing"])})
+
+    with pytest.raises(ValueError, match="unknown task"):
+        run_task_graph({"a": (succeed, [], ["missing"])})